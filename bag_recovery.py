@@ -0,0 +1,133 @@
+"""
+Rebuild the bag from UE_game.log when the tracker starts mid-session.
+
+The game writes a full BagMgr@:InitBagData burst whenever the bag is sorted
+or the character logs in, and a Modfy BagItem line for every later change.
+reconstruct_bag() reads the log backwards from the tailer's start position to
+the most recent burst of at least min_entries lines, loads it as a snapshot,
+then reads forward from the end of the burst and applies every Modfy line, so
+the bag matches the game without the user clicking Initialize and sorting.
+
+Memory stays bounded and most of the log is never decoded: the backward scan
+skips whole blocks with bytes.rfind() until it reaches an InitBagData line and
+keeps only the burst lines, and the forward pass works through block_size
+pieces, skipping blocks with no BagMgr@ line.
+"""
+
+import os
+import time
+
+from bag_tracker import BagState
+from log_parser import parse_log_chunk
+from reverse_reader import iter_lines_reversed, BLOCK_SIZE
+
+_INIT_MARKER = b"BagMgr@:InitBagData "
+_BAG_MARKER = b"BagMgr@"
+MIN_SNAPSHOT_ENTRIES = 20
+
+
+class BagRecovery:
+    """A bag rebuilt from the log, and what it took to rebuild it"""
+
+    __slots__ = ("bag", "snapshot_offset", "snapshot_entries", "modifications", "bytes_scanned", "elapsed")
+
+    def __init__(self, bag, snapshot_offset, snapshot_entries):
+        self.bag = bag
+        self.snapshot_offset = snapshot_offset
+        self.snapshot_entries = snapshot_entries
+        self.modifications = 0
+        self.bytes_scanned = 0
+        self.elapsed = 0.0
+
+
+def find_last_snapshot(f, end, min_entries=MIN_SNAPSHOT_ENTRIES, max_bytes=None, block_size=BLOCK_SIZE):
+    """Find the newest InitBagData burst before `end` in a binary file.
+
+    Returns (burst_start, burst_end, init_records), or None if no burst of at least
+    min_entries lines lies within max_bytes of `end`.
+    """
+    limit = 0 if max_bytes is None else max(0, end - max_bytes)
+    while True:
+        # Skip back over whole blocks to the last InitBagData line, then walk its burst line by line
+        hit = _rfind(f, _INIT_MARKER, limit, end, block_size)
+        if hit < 0:
+            return None
+        f.seek(hit)
+        tail = f.read(min(4096, end - hit))
+        newline = tail.find(b"\n")
+        burst_end = hit + newline + 1 if newline >= 0 else end
+        burst = []           # burst lines, newest first
+        burst_start = burst_end
+        for offset, line in iter_lines_reversed(f, burst_end):
+            if _INIT_MARKER not in line:
+                break
+            burst.append(line)
+            burst_start = offset
+        if len(burst) >= min_entries:
+            return _snapshot(burst, burst_start, burst_end)
+        # Too small to be a full snapshot (the live tracker ignores these too); keep looking
+        end = burst_start
+
+
+def _rfind(f, marker, start, end, block_size):
+    """Offset of the last occurrence of marker within [start, end) of a binary file, or -1"""
+    pos = end
+    while pos > start:
+        block_start = max(start, pos - block_size)
+        f.seek(block_start)
+        # Overlap the next block by len(marker) - 1 so a marker split between blocks is found
+        data = f.read(min(end, pos + len(marker) - 1) - block_start)
+        idx = data.rfind(marker)
+        if idx >= 0:
+            return block_start + idx
+        pos = block_start
+    return -1
+
+
+def _snapshot(burst, start, stop):
+    burst.reverse()
+    text = b"\n".join(burst).decode("utf-8", errors="replace")
+    return start, stop, parse_log_chunk(text).bag_init
+
+
+def replay_modifications(f, start, end, bag, block_size=1024 * 1024):
+    """Apply every Modfy BagItem line between start and end to bag; returns the number applied"""
+    applied = 0
+    f.seek(start)
+    pos = start
+    carry = b""
+    while pos < end:
+        data = f.read(min(block_size, end - pos))
+        if not data:
+            break
+        pos += len(data)
+        data = carry + data
+        # A line cut off at `end` is left out; the tailer starts reading from there too
+        cut = data.rfind(b"\n") + 1
+        carry = data[cut:]
+        block = data[:cut]
+        if _BAG_MARKER not in block:
+            continue
+        records = parse_log_chunk(block.decode("utf-8", errors="replace")).bag_modify
+        bag.apply(records)
+        applied += len(records)
+    return applied
+
+
+def reconstruct_bag(path, end=None, max_bytes=None, min_entries=MIN_SNAPSHOT_ENTRIES):
+    """Rebuild the bag as of byte offset `end` (default EOF); returns a BagRecovery or None"""
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        if end is None:
+            end = f.seek(0, os.SEEK_END)
+        found = find_last_snapshot(f, end, min_entries, max_bytes)
+        if found is None:
+            return None
+        burst_start, burst_end, init_records = found
+        bag = BagState()
+        bag.load_snapshot(init_records)
+        recovery = BagRecovery(bag, burst_start, len(init_records))
+        recovery.modifications = replay_modifications(f, burst_end, end, bag)
+    recovery.bytes_scanned = end - burst_start
+    recovery.elapsed = time.perf_counter() - started
+    return recovery
@@ -0,0 +1,59 @@
+"""
+Incrementally maintained inventory state.
+
+Slots are stored in a table keyed by (page_id, slot_id, item_id) and every
+update adjusts a per-ConfigBaseId running total, so applying a Modfy line is
+O(1) and resetting the map baseline is a copy of the totals dict rather than a
+re-parse of every slot key.
+"""
+
+
+class BagState:
+    """Slot table plus per-item totals and the baseline drops are measured against"""
+
+    def __init__(self):
+        self.slots = {}        # (page_id, slot_id, item_id) -> quantity in that slot
+        self.totals = {}       # item_id -> quantity summed over all slots
+        self.baseline = {}     # item_id -> total at the last initialization / map entry
+        self.total_count = 0   # sum of all totals (used to spot an empty first snapshot)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def clear(self):
+        self.slots.clear()
+        self.totals.clear()
+        self.baseline.clear()
+        self.total_count = 0
+
+    def set_slot(self, page_id, slot_id, item_id, num):
+        """Record the new quantity of a slot and return the change for item_id"""
+        key = (page_id, slot_id, item_id)
+        delta = num - self.slots.get(key, 0)
+        self.slots[key] = num
+        if delta:
+            self.totals[item_id] = self.totals.get(item_id, 0) + delta
+            self.total_count += delta
+        return delta
+
+    def apply(self, records):
+        """Apply BagRecords in order and return {item_id: net change} for this batch"""
+        changes = {}
+        for page_id, slot_id, item_id, num in records:
+            delta = self.set_slot(page_id, slot_id, item_id, num)
+            if delta:
+                changes[item_id] = changes.get(item_id, 0) + delta
+        return changes
+
+    def load_snapshot(self, records):
+        """Replace the whole state with a full inventory snapshot and use it as the baseline"""
+        self.clear()
+        self.apply(records)
+        self.reset_baseline()
+
+    def total(self, item_id):
+        return self.totals.get(item_id, 0)
+
+    def reset_baseline(self):
+        """Measure subsequent changes from the current totals"""
+        self.baseline = dict(self.totals)
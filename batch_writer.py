@@ -0,0 +1,110 @@
+"""
+Background batching shared by the drop journal and the history database.
+
+Producers (the log thread, the parse workers) only append items to an
+in-memory queue. A daemon writer thread hands the queue to write_batch() once
+it holds max_items items or max_delay seconds have passed, so bursts cost one
+write per batch. Without a thread (never started, or after close()) put()
+writes in the caller's thread.
+
+close() writes what is left, stops the thread and then runs the owner's
+release callback (closing the file or connection) under the same lock that
+serializes write_batch(). Items put after that are dropped, so a thread that
+is still running at shutdown never writes to a closed handle.
+"""
+
+import threading
+
+
+class BatchWriter:
+    """Queue of items written in batches by write_batch(batch) on a daemon thread"""
+
+    def __init__(self, write_batch, name, max_items, max_delay):
+        self.write_batch = write_batch
+        self.name = name
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self.dropped = 0          # items put after close()
+        self._queue = []
+        self._closed = False      # close() started; producers write in their own thread
+        self._finished = False    # close() released the handle; items are dropped
+        self._cond = threading.Condition()    # guards the queue and wakes the writer
+        # Serializes write_batch() and the release in close(); owners may hold it for reads too
+        self.io_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def start(self):
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def put(self, items):
+        """Queue items; returns False if the writer is closed and they were dropped"""
+        if not items:
+            return True
+        with self._cond:
+            if self._finished:
+                if not self.dropped:
+                    print(f"{self.name} is closed, dropping further writes")
+                self.dropped += len(items)
+                return False
+            self._queue.extend(items)
+            write_now = self._closed or self._thread is None
+            if not write_now and len(self._queue) >= self.max_items:
+                self._cond.notify()
+        if write_now:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Write every queued item now, in the caller's thread"""
+        with self._cond:
+            batch = self._take()
+        self._write(batch)
+
+    def close(self, release=None):
+        """Write pending items, stop the writer thread, then run release() under io_lock"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        with self._cond:
+            self._finished = True
+            self._queue = []
+        with self.io_lock:
+            if release is not None:
+                release()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._queue) < self.max_items:
+                    self._cond.wait(self.max_delay)
+                closed = self._closed
+                batch = self._take()
+            # The write happens outside the queue lock so producers never wait on disk
+            self._write(batch)
+            if closed:
+                return
+
+    def _take(self):
+        batch = self._queue
+        self._queue = []
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        with self.io_lock:
+            if self._finished:
+                # A batch taken before close() finished; the handle is already released
+                return
+            self.write_batch(batch)
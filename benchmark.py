@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""benchmark.py
+
+Time each stage of the tracker's hot loop over a synthetic (or saved) UE_game.log.
+- tokenize: parse_log_chunk() over full chunks
+- map detection / bag parsing / price parsing: the tokenizer over only the
+  lines of that family (scene + noise lines, BagMgr lines, price-check blocks)
+- bag diffing: TrackerSession.process_chunk() over pre-tokenized chunks
+- catalog load / catalog lookup: ItemCatalog reload and per-drop name/price lookups
+- mmap scan: log_scanner over the whole file (bytes/sec)
+- replay / replay mmap: the whole headless pipeline end to end, parsing every
+  line or only the lines the mmap scanner picks out
+
+Reports the best of --repeat runs as lines/sec (or ops/sec) plus peak memory
+measured in a separate tracemalloc run, so the timing itself is not skewed.
+Save results with --json and compare a later run against them with --baseline.
+
+Usage: python benchmark.py [--log UE_game.log] [--maps 200] [--repeat 5]
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import synthetic_log
+from catalog import ItemCatalog
+from log_parser import parse_log_chunk, PriceCheckParser
+from log_scanner import scan_lines
+from replay import iter_chunks, replay
+from tracker import TrackerSession
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CHUNK_BYTES = 256 * 1024
+
+
+def split_line_families(text):
+    """Split a log into scene/noise lines, BagMgr lines and price-check block lines"""
+    scene, bag, price = [], [], []
+    in_price = False
+    for line in text.splitlines(True):
+        if "XchgSearchPrice----SynId" in line:
+            in_price = True
+        if in_price:
+            price.append(line)
+            if "----Socket" in line and "End----" in line:
+                in_price = False
+        elif "BagMgr@:" in line:
+            bag.append(line)
+        else:
+            scene.append(line)
+    return "".join(scene), "".join(bag), "".join(price)
+
+
+def chunked(text):
+    return list(iter_chunks(io.StringIO(text), CHUNK_BYTES))
+
+
+def count_lines(chunks):
+    return sum(c.count("\n") for c in chunks)
+
+
+class Stage:
+    """A named benchmark: setup() runs untimed, run() is timed and returns the work done"""
+
+    def __init__(self, name, unit, run, setup=None):
+        self.name = name
+        self.unit = unit
+        self.run = run
+        self.setup = setup or (lambda: None)
+
+
+def build_stages(log_path, catalog_path):
+    with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    scene_text, bag_text, price_text = split_line_families(text)
+    chunks = chunked(text)
+    families = {
+        "map detection": chunked(scene_text),
+        "bag parsing": chunked(bag_text),
+        "price parsing": chunked(price_text),
+    }
+
+    catalog = ItemCatalog(catalog_path)
+    catalog.refresh()
+    parsed = [parse_log_chunk(c, PriceCheckParser()) for c in chunks]
+
+    def tokenize(parts):
+        def run():
+            price_parser = PriceCheckParser()
+            for part in parts:
+                parse_log_chunk(part, price_parser)
+            return count_lines(parts)
+        return run
+
+    state = {}
+
+    def diff_setup():
+        state["session"] = TrackerSession(catalog)
+        state["session"].start_initialization()
+
+    def bag_diffing():
+        session = state["session"]
+        events = 0
+        for chunk in parsed:
+            events += len(session.process_chunk(chunk, now=0.0).drops)
+        state["drop_ids"] = list(session.drop_list_all) or list(catalog.names)[:50]
+        return sum(c.line_count for c in parsed)
+
+    def catalog_load():
+        for _ in range(20):
+            catalog.reload()
+        return 20
+
+    def catalog_lookup():
+        session = TrackerSession(catalog)
+        ids = state.get("drop_ids") or list(catalog.names)
+        lookups = 0
+        for _ in range(200):
+            # The app refreshes once per chunk, then looks up every drop in it
+            catalog.refresh()
+            for item_id in ids:
+                catalog.name(item_id)
+                if item_id in catalog.prices:
+                    session.item_price(item_id)
+                lookups += 1
+        return lookups
+
+    def mmap_scan():
+        for _ in scan_lines(log_path):
+            pass
+        return os.path.getsize(log_path)
+
+    def end_to_end(use_mmap):
+        def run():
+            with open(os.devnull, "w") as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    stats = replay(log_path, catalog, use_mmap=use_mmap)
+                finally:
+                    sys.stdout = stdout
+            # Bytes for the mmap run, since it only counts the lines it decodes
+            return stats["bytes"] if use_mmap else stats["lines"]
+        return run
+
+    stages = [Stage("tokenize", "lines", tokenize(chunks))]
+    for name, parts in families.items():
+        stages.append(Stage(name, "lines", tokenize(parts)))
+    stages += [
+        Stage("bag diffing", "lines", bag_diffing, diff_setup),
+        Stage("catalog load", "loads", catalog_load),
+        Stage("catalog lookup", "lookups", catalog_lookup),
+        Stage("mmap scan", "bytes", mmap_scan),
+        Stage("replay", "lines", end_to_end(False)),
+        Stage("replay mmap", "bytes", end_to_end(True)),
+    ]
+    return stages
+
+
+def measure(stage, repeat):
+    best = None
+    work = 0
+    devnull = open(os.devnull, "w")
+    try:
+        for _ in range(repeat):
+            stage.setup()
+            gc.collect()
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                start = time.perf_counter()
+                work = stage.run()
+                elapsed = time.perf_counter() - start
+            finally:
+                sys.stdout = stdout
+            best = elapsed if best is None else min(best, elapsed)
+
+        stage.setup()
+        gc.collect()
+        tracemalloc.start()
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            stage.run()
+        finally:
+            sys.stdout = stdout
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        devnull.close()
+    return {
+        "unit": stage.unit,
+        "work": work,
+        "seconds": best,
+        "rate": work / best if best else 0.0,
+        "peak_kb": peak / 1024,
+    }
+
+
+def print_results(results, baseline=None):
+    print(f"{'stage':<16}{'work':>12}  {'unit':<8}{'best s':>9}{'rate/s':>14}{'peak KiB':>11}{'vs base':>10}")
+    for name, r in results.items():
+        delta = ""
+        if baseline and name in baseline and baseline[name].get("rate"):
+            change = (r["rate"] - baseline[name]["rate"]) / baseline[name]["rate"] * 100
+            delta = f"{change:+.1f}%"
+        print(f"{name:<16}{r['work']:>12,}  {r['unit']:<8}{r['seconds']:>9.4f}{r['rate']:>14,.0f}"
+              f"{r['peak_kb']:>11,.0f}{delta:>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the tracker's parsing stages")
+    parser.add_argument("--log", help="benchmark this log instead of generating a synthetic one")
+    parser.add_argument("--maps", type=int, default=200, help="map runs in the synthetic log")
+    parser.add_argument("--noise", type=int, default=400, help="unrelated lines per map in the synthetic log")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage (best is reported)")
+    parser.add_argument("--catalog", default=os.path.join(ROOT, "full_table.json"))
+    parser.add_argument("--stage", action="append", help="only run the named stage(s)")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare rates against results saved with --json")
+    args = parser.parse_args(argv)
+
+    tmp_path = None
+    log_path = args.log
+    if not log_path:
+        fd, tmp_path = tempfile.mkstemp(suffix=".log", prefix="tli_bench_")
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+            lines = synthetic_log.generate(f, maps=args.maps, noise=args.noise, seed=args.seed)
+        log_path = tmp_path
+        print(f"Synthetic log: {lines:,} lines, {os.path.getsize(log_path) / 1048576:.1f} MB "
+              f"({args.maps} maps, seed {args.seed})")
+
+    try:
+        results = {}
+        for stage in build_stages(log_path, args.catalog):
+            if args.stage and stage.name not in args.stage:
+                continue
+            results[stage.name] = measure(stage, args.repeat)
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
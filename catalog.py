@@ -0,0 +1,191 @@
+"""
+In-memory view of full_table.json shared by the log thread and the UI.
+
+The table is parsed once and only re-read when the file's mtime/size changes on
+disk (manual edits, update_full_table.py) or when the app invalidates it after
+writing the file itself. Price updates are applied in batches and written with
+write_json_atomic(), so a crash mid-write never leaves a truncated table.
+
+When full_table.bin (compiled_catalog) was compiled from the JSON currently on
+disk it is loaded instead, and the full JSON table is only parsed once
+something needs to edit it. Only a catalog created with compile=True (the app)
+writes full_table.bin, after it loads or saves the JSON; read-only tools such
+as replay.py and benchmark.py leave the directory untouched.
+"""
+
+import json
+import os
+import threading
+import time
+
+from compiled_catalog import compile_catalog, compiled_path, load_compiled
+
+
+def write_json_atomic(path, data, indent=4):
+    """Write JSON to a temp file next to path, then atomically replace path with it"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ItemCatalog:
+    """Cached item names, types, prices and last_update values keyed by string id"""
+
+    def __init__(self, path, compiled=True, compile=False):
+        self.path = path
+        self.compiled_path = compiled_path(path) if compiled else None
+        self.compile = compile   # write full_table.bin after loading or saving the JSON
+        self._table = {}
+        self.names = {}
+        self.types = {}
+        self.prices = {}
+        self.last_update = {}
+        self.load_count = 0
+        self.version = 0        # bumped whenever the in-memory table is replaced
+        self.loaded_from = None  # "json" or "compiled"
+        self._stamp = None
+        # Held for every read-modify-write of the file so writers never interleave
+        self.lock = threading.RLock()
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def refresh(self):
+        """Reload the table if the file changed since the last load. Returns True if reloaded."""
+        stamp = self._file_stamp()
+        if stamp is not None and stamp == self._stamp:
+            return False
+        with self.lock:
+            if stamp is not None and stamp == self._stamp:
+                return False
+            return self._load(stamp)
+
+    def invalidate(self):
+        """Force the next refresh() to re-read the file (call after writing it)"""
+        with self.lock:
+            self._stamp = None
+
+    def reload(self):
+        """Unconditionally re-read the file"""
+        with self.lock:
+            return self._load(self._file_stamp())
+
+    @property
+    def table(self):
+        """The full JSON table; after a compiled load it is parsed on first use"""
+        table = self._table
+        if table is None:
+            with self.lock:
+                if self._table is None:
+                    with open(self.path, 'r', encoding="utf-8") as f:
+                        self._table = json.load(f)
+                table = self._table
+        return table
+
+    def _load(self, stamp):
+        if self.compiled_path and stamp is not None:
+            compiled = load_compiled(self.compiled_path, stamp)
+            if compiled is not None:
+                self._index_compiled(compiled, stamp)
+                self.load_count += 1
+                return True
+        with open(self.path, 'r', encoding="utf-8") as f:
+            table = json.load(f)
+        self._index(table, stamp)
+        self.load_count += 1
+        # The compiled copy was missing or stale: rebuild it for the next start
+        self._compile(table, stamp)
+        return True
+
+    def _compile(self, table, stamp):
+        if not self.compile or not self.compiled_path or stamp is None:
+            return
+        try:
+            compile_catalog(table, self.compiled_path, stamp)
+        except OSError as e:
+            print(f"Failed to write {self.compiled_path}: {e}")
+
+    def _index(self, table, stamp):
+        names, types, prices, last_update = {}, {}, {}, {}
+        for item_id, entry in table.items():
+            item_id = str(item_id)
+            names[item_id] = entry.get("name", "")
+            types[item_id] = entry.get("type", "")
+            prices[item_id] = entry.get("price", 0)
+            last_update[item_id] = entry.get("last_update", 0)
+        self._swap(table, names, types, prices, last_update, stamp, "json")
+
+    def _index_compiled(self, compiled, stamp):
+        ids = [str(item_id) for item_id in compiled.ids]
+        self._swap(None, dict(zip(ids, compiled.names)), dict(zip(ids, compiled.types)),
+                   dict(zip(ids, compiled.prices)), dict(zip(ids, compiled.last_update)), stamp, "compiled")
+
+    def _swap(self, table, names, types, prices, last_update, stamp, source):
+        # Swap in complete dicts so readers on other threads never see a half-built table
+        self._table = table
+        self.names = names
+        self.types = types
+        self.prices = prices
+        self.last_update = last_update
+        self._stamp = stamp
+        self.loaded_from = source
+        self.version += 1
+
+    def save(self, table):
+        """Atomically write table to disk and adopt it as the in-memory copy"""
+        with self.lock:
+            write_json_atomic(self.path, table)
+            stamp = self._file_stamp()
+            self._index(table, stamp)
+            self._compile(table, stamp)
+
+    def update_prices(self, prices, source):
+        """Write a batch of {item_id: price} in one atomic file replace.
+
+        Returns the ids that were updated; ids missing from the table are skipped.
+        """
+        with self.lock:
+            self.refresh()
+            table = dict(self.table)
+            now = round(time.time())
+            updated = []
+            for item_id, price in prices.items():
+                item_id = str(item_id)
+                if item_id not in table:
+                    continue
+                entry = dict(table[item_id])
+                entry['last_time'] = now
+                entry['from'] = source
+                entry['price'] = price
+                table[item_id] = entry
+                updated.append(item_id)
+            if updated:
+                self.save(table)
+            return updated
+
+    def columns(self):
+        """(names, types, last_update) of one table version; refresh/save cannot swap between the reads"""
+        with self.lock:
+            return self.names, self.types, self.last_update
+
+    def __contains__(self, item_id):
+        return str(item_id) in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def get(self, item_id, default=None):
+        return self.table.get(str(item_id), default)
+
+    def name(self, item_id, default=None):
+        return self.names.get(str(item_id), default)
+
+    def price(self, item_id, default=0):
+        return self.prices.get(str(item_id), default)
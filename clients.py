@@ -0,0 +1,170 @@
+"""
+Several game clients tracked from one process.
+
+Each running client writes its own UE_game.log. A GameClient bundles what one
+log needs: its LogTailer, its PriceCheckParser (price checks span chunks) and
+its TrackerSession. ClientPoller follows every client's tailer from a single
+thread and hands new text to a small worker pool. A client has at most one
+chunk in flight, so its chunks are still applied in log order while other
+clients are parsed alongside it.
+
+AggregateView sums several sessions (and their rolling rates) for the "All
+clients" view of the main window; the UI reads it exactly like a
+TrackerSession.
+"""
+
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from lag_monitor import LagMonitor
+from log_parser import PriceCheckParser
+from log_tailer import LogTailer
+from metrics_server import RateCounter
+from tracker import TrackerSession
+
+
+class GameClient:
+    """One game log and the tracking state built from it"""
+
+    def __init__(self, log_path, catalog, name=None):
+        self.log_path = log_path
+        self.name = name or log_path
+        self.tailer = LogTailer(log_path)
+        self.price_parser = PriceCheckParser()
+        self.session = TrackerSession(catalog)
+        self.store_session_id = None     # this client's row in the history database
+        self.lines_parsed = 0
+        self.line_rate = RateCounter()
+        self.lag = LagMonitor()
+
+    def set_log(self, log_path, name=None):
+        """Point a client that has not started tailing yet at another log"""
+        self.log_path = log_path
+        self.name = name or self.name
+        self.tailer = LogTailer(log_path)
+
+
+class AggregateView:
+    """Read-only sum of several TrackerSessions"""
+
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+
+    @property
+    def effective_prices(self):
+        return self.sessions[0].effective_prices
+
+    @property
+    def income(self):
+        return sum(s.income for s in self.sessions)
+
+    @property
+    def income_all(self):
+        return sum(s.income_all for s in self.sessions)
+
+    @property
+    def map_count(self):
+        return sum(s.map_count for s in self.sessions)
+
+    @property
+    def is_in_map(self):
+        return any(s.is_in_map for s in self.sessions)
+
+    @property
+    def rates(self):
+        return SummedRates([s.rates for s in self.sessions])
+
+    @property
+    def drop_list(self):
+        return self.copy_drops(False)
+
+    @property
+    def drop_list_all(self):
+        return self.copy_drops(True)
+
+    def copy_drops(self, all_maps=False):
+        merged = {}
+        for s in self.sessions:
+            # Copied under each session's lock: the sessions keep changing on the worker threads
+            for item_id, amount in s.copy_drops(all_maps).items():
+                merged[item_id] = merged.get(item_id, 0) + amount
+        return merged
+
+    # Clients play side by side, so the combined rate is the summed income over the longest clock
+    def current_map_time(self, now=None):
+        return max(s.current_map_time(now) for s in self.sessions)
+
+    def total_play_time(self, now=None):
+        return max(s.total_play_time(now) for s in self.sessions)
+
+
+class SummedRates:
+    """Rolling rates of several sessions added up window by window"""
+
+    def __init__(self, rates):
+        self.rates = rates
+
+    def per_minute(self, now=None):
+        now = time.time() if now is None else now
+        summed = None
+        for rates in self.rates:
+            values = rates.per_minute(now)
+            if summed is None:
+                summed = values
+            else:
+                summed = [(label, total + rate) for (label, total), (_, rate) in zip(summed, values)]
+        return summed or []
+
+
+class ClientPoller:
+    """Polls every client's tailer on one thread and parses new text on a small worker pool"""
+
+    def __init__(self, handler, workers=2, idle_delay=1.0):
+        self.handler = handler           # handler(client, text), run on a worker thread
+        self.idle_delay = idle_delay     # sleep when no tailer is open
+        self.clients = []
+        self._pending = {}               # client -> Future of its chunk in flight
+        self._due = {}                   # client -> perf_counter time of its next poll
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="Parse")
+
+    def add(self, client):
+        self.clients.append(client)
+        self._due[client] = 0.0
+
+    def busy(self, client):
+        future = self._pending.get(client)
+        return future is not None and not future.done()
+
+    def poll_once(self):
+        """Read every client that is due and not busy; returns how long to sleep before the next call"""
+        now = time.perf_counter()
+        next_due = None
+        for client in self.clients:
+            tailer = client.tailer
+            if not tailer.is_open:
+                continue
+            if self.busy(client):
+                # Look again soon; its next chunk has to wait for this one anyway
+                due = now + tailer.min_interval
+            else:
+                if self._due[client] <= now:
+                    text = tailer.poll(wait=False)
+                    self._due[client] = now + tailer.interval
+                    if text:
+                        self._pending[client] = self._executor.submit(self._run, client, text)
+                due = self._due[client]
+            next_due = due if next_due is None else min(next_due, due)
+        if next_due is None:
+            return self.idle_delay
+        return max(0.0, next_due - time.perf_counter())
+
+    def _run(self, client, text):
+        try:
+            self.handler(client, text)
+        except Exception:
+            print(f"-------------Exception ({client.name})-----------")
+            traceback.print_exc()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
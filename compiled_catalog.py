@@ -0,0 +1,142 @@
+"""
+Compact binary form of full_table.json (full_table.bin).
+
+full_table.json stays the authoritative, hand-editable table. Whenever the app
+(ItemCatalog.save, apply_local_overrides) or update_full_table.py writes it,
+a compiled copy is written next to it:
+
+    header   magic, format version, item count, the JSON file's (mtime_ns, size)
+             it was compiled from, payload length and SHA-1 of the payload
+    payload  interned strings (names and types, NUL-separated UTF-8), then
+             packed little-endian arrays: item ids (int64), name index and type
+             index (uint32), price and last_update (float64)
+
+ItemCatalog loads the compiled copy when its recorded source stamp matches the
+JSON file on disk, and falls back to parsing the JSON when it is missing,
+stale, corrupt or from another format version.
+"""
+
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"TLIC"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHHIqqI20s")
+
+
+def compiled_path(json_path):
+    return os.path.splitext(json_path)[0] + ".bin"
+
+
+def source_stamp(path):
+    """(mtime_ns, size) of a file, or None if it cannot be read"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class CompiledCatalog:
+    """Item columns decoded from a compiled catalog; ids are ints, strings are interned"""
+
+    __slots__ = ("ids", "names", "types", "prices", "last_update", "stamp")
+
+    def __init__(self, ids, names, types, prices, last_update, stamp):
+        self.ids = ids
+        self.names = names
+        self.types = types
+        self.prices = prices
+        self.last_update = last_update
+        self.stamp = stamp
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def _packed(typecode, values):
+    arr = array(typecode, values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpacked(typecode, data, offset, count):
+    arr = array(typecode)
+    end = offset + count * arr.itemsize
+    arr.frombytes(data[offset:end])
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr, end
+
+
+def compile_catalog(table, out_path, stamp):
+    """Write table ({id: {name, type, price, ...}}) compiled for the JSON file with `stamp`.
+
+    Returns False (and writes nothing) if the table has an id or value the format cannot hold.
+    """
+    strings = {}
+    ids, name_idx, type_idx, prices, last_update = [], [], [], [], []
+    try:
+        for item_id, entry in table.items():
+            ids.append(int(item_id))
+            name_idx.append(strings.setdefault(entry.get("name", "") or "", len(strings)))
+            type_idx.append(strings.setdefault(entry.get("type", "") or "", len(strings)))
+            prices.append(float(entry.get("price", 0) or 0))
+            last_update.append(float(entry.get("last_update", 0) or 0))
+    except (TypeError, ValueError, AttributeError) as e:
+        print(f"Not compiling {out_path}: {e}")
+        return False
+    if any("\0" in s for s in strings):
+        print(f"Not compiling {out_path}: NUL in an item name")
+        return False
+
+    blob = "\0".join(strings).encode("utf-8")
+    payload = b"".join((
+        struct.pack("<I", len(blob)), blob,
+        _packed("q", ids), _packed("I", name_idx), _packed("I", type_idx),
+        _packed("d", prices), _packed("d", last_update),
+    ))
+    mtime_ns, size = stamp
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(ids), mtime_ns, size, len(payload),
+                          hashlib.sha1(payload).digest())
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, out_path)
+    return True
+
+
+def load_compiled(path, expected_stamp=None):
+    """Read a compiled catalog; None if missing, corrupt, another version, or not built from expected_stamp"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, _, count, mtime_ns, size, payload_len, digest = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    stamp = (mtime_ns, size)
+    if expected_stamp is not None and stamp != tuple(expected_stamp):
+        return None
+    payload = memoryview(data)[_HEADER.size:]
+    if len(payload) != payload_len or hashlib.sha1(payload).digest() != digest:
+        return None
+
+    (blob_len,) = struct.unpack_from("<I", payload)
+    offset = 4 + blob_len
+    strings = bytes(payload[4:offset]).decode("utf-8").split("\0")
+    ids, offset = _unpacked("q", payload, offset, count)
+    name_idx, offset = _unpacked("I", payload, offset, count)
+    type_idx, offset = _unpacked("I", payload, offset, count)
+    prices, offset = _unpacked("d", payload, offset, count)
+    last_update, offset = _unpacked("d", payload, offset, count)
+    return CompiledCatalog(ids, [strings[i] for i in name_idx], [strings[i] for i in type_idx],
+                           prices, last_update, stamp)
@@ -0,0 +1,124 @@
+"""
+In-memory settings from config.json with debounced persistence.
+
+Settings are read once at startup. set() updates memory, notifies listeners
+right away and schedules a save; further changes within `delay` seconds push
+the save back, so dragging the opacity slider writes the file once when the
+drag settles instead of on every motion event. One long-lived daemon thread
+waits for that deadline, so a drag never starts a thread per motion event.
+Saves use write_json_atomic(), and save() / close() write any pending change
+immediately.
+"""
+
+import json
+import threading
+import time
+
+from catalog import write_json_atomic
+
+DEFAULT_CONFIG = {
+    "opacity": 1.0,
+    "tax": 0,
+    "user": "",
+    "standalone": False,
+}
+
+
+class ConfigStore:
+    """config.json kept in memory; listeners are called as fn(key, value) on every change"""
+
+    def __init__(self, path, defaults=None, delay=0.5):
+        self.path = path
+        self.delay = delay
+        self.data = dict(defaults or {})
+        self.saves = 0
+        self._listeners = {}     # key (None = every key) -> [fn]
+        self._pending = False    # a change waits for the debounced save
+        self._deadline = 0.0     # time.monotonic() when it is written
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def load(self):
+        """Read the file over the defaults; creates it if it does not exist yet"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.data.update(json.load(f))
+        except FileNotFoundError:
+            self.save()
+        except Exception as e:
+            print(f"Error reading {self.path}, using defaults: {e}")
+        return self
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def set(self, key, value):
+        """Change a setting, notify listeners and schedule a save. No-op if unchanged."""
+        if key in self.data and self.data[key] == value:
+            return
+        self.data[key] = value
+        for fn in self._listeners.get(key, []) + self._listeners.get(None, []):
+            fn(key, value)
+        self._schedule_save()
+
+    def add_listener(self, fn, key=None):
+        self._listeners.setdefault(key, []).append(fn)
+
+    def save(self):
+        """Write the settings now, cancelling any pending debounced save"""
+        with self._cond:
+            self._pending = False
+            data = dict(self.data)
+        try:
+            write_json_atomic(self.path, data)
+            self.saves += 1
+        except OSError as e:
+            print(f"Failed to save {self.path}: {e}")
+
+    def close(self):
+        """Write a pending change, if any, and stop the saver thread"""
+        with self._cond:
+            pending = self._pending
+            self._closed = True
+            self._cond.notify()
+        if pending:
+            self.save()
+
+    def _schedule_save(self):
+        with self._cond:
+            if self._closed:
+                pending = True
+            else:
+                pending = False
+                self._pending = True
+                self._deadline = time.monotonic() + self.delay
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="ConfigSaver", daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+        if pending:
+            # Changed after close(): nothing will save it later
+            self.save()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # Sleep until the newest change has been left alone for `delay` seconds
+                while not self._closed:
+                    if not self._pending:
+                        self._cond.wait()
+                        continue
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+            self.save()
@@ -0,0 +1,80 @@
+"""
+Buffered background writer for the drop journal (drop.txt).
+
+The log thread only appends lines to an in-memory queue; a batch_writer thread
+flushes the queue with one write per batch once it holds max_lines lines or
+max_delay seconds have passed, so a big loot pickup costs one write instead of
+an open/write/close per item type. close() flushes whatever is left and
+closes the file; lines written after that are dropped.
+
+Durability policies:
+- "immediate": write and flush in the caller's thread (the old behaviour)
+- "batched":   flush each batch to the OS (default)
+- "fsync":     flush and fsync each batch, so a batch survives a power loss
+"""
+
+import os
+
+from batch_writer import BatchWriter
+
+DURABILITY_POLICIES = ("immediate", "batched", "fsync")
+
+
+class DropJournal:
+    """Append-only text journal with batched writes on a background thread"""
+
+    def __init__(self, path, durability="batched", max_lines=64, max_delay=1.0):
+        if durability not in DURABILITY_POLICIES:
+            print(f"Unknown journal durability '{durability}', using 'batched'")
+            durability = "batched"
+        self.path = path
+        self.durability = durability
+        self.lines_written = 0
+        self.batches_written = 0
+        self._file = None
+        self._writer = BatchWriter(self._write, "DropJournal", max_lines, max_delay)
+
+    def start(self):
+        if self.durability != "immediate":
+            self._writer.start()
+        return self
+
+    def write(self, line):
+        """Queue one line (including its trailing newline)"""
+        self.write_many([line])
+
+    def write_many(self, lines):
+        self._writer.put(lines)
+
+    def flush(self):
+        """Write every queued line now, in the caller's thread"""
+        self._writer.flush()
+
+    def close(self):
+        """Flush pending lines, stop the writer thread and close the file"""
+        self._writer.close(self._close_file)
+
+    def _close_file(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, batch):
+        try:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write("".join(batch))
+            self._file.flush()
+            if self.durability == "fsync":
+                os.fsync(self._file.fileno())
+            self.lines_written += len(batch)
+            self.batches_written += 1
+        except OSError as e:
+            print(f"Failed to write {len(batch)} lines to {self.path}: {e}")
+            # Drop the handle so the next batch reopens the file
+            try:
+                if self._file:
+                    self._file.close()
+            except OSError:
+                pass
+            self._file = None
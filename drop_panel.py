@@ -0,0 +1,108 @@
+"""
+Incremental rendering of the drops panel (a Tk Text widget, one line per item).
+
+DropPanel remembers which item id is on which line and what text it shows.
+render() takes the new sorted rows and only touches the lines that changed:
+- rows whose item left the list are deleted
+- rows whose text or colour changed are rewritten in place
+- when the sort order changes, only the rows outside the longest run that kept
+  its relative order are moved, so one item climbing past others is one delete
+  and one insert rather than a rebuild of everything below it
+
+Colours use two shared tags configured once, instead of a tag per item.
+"""
+
+from bisect import bisect_left
+
+GAIN_TAG = "gain"
+LOSS_TAG = "loss"
+TAG_COLORS = {GAIN_TAG: "#006400", LOSS_TAG: "#b20000"}
+
+
+def stable_positions(sequence):
+    """Indices of a longest strictly increasing subsequence of `sequence`"""
+    tails = []       # tails[k]: index into sequence ending the best run of length k + 1
+    tail_values = []
+    parents = [-1] * len(sequence)
+    for i, value in enumerate(sequence):
+        k = bisect_left(tail_values, value)
+        if k > 0:
+            parents[i] = tails[k - 1]
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+    keep = set()
+    i = tails[-1] if tails else -1
+    while i >= 0:
+        keep.add(i)
+        i = parents[i]
+    return keep
+
+
+class DropPanel:
+    """Row model for the drops Text widget; rows are (item_id, text, tag) in display order"""
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.order = []      # item ids, one per line, top to bottom
+        self.rows = {}       # item_id -> (text, tag) currently shown
+        self.line_writes = 0
+        self.dirty = True    # widget holds text the model does not know about
+        for tag, color in TAG_COLORS.items():
+            widget.tag_config(tag, foreground=color)
+
+    def clear(self):
+        """Forget the current rows; the next render starts from an empty widget"""
+        self.dirty = True
+
+    def render(self, rows):
+        """Bring the widget in line with `rows`, touching as few lines as possible"""
+        widget = self.widget
+        widget.config(state='normal')
+        try:
+            if self.dirty:
+                widget.delete("1.0", "end")
+                self.order = []
+                self.rows = {}
+                self.dirty = False
+            self._apply(rows)
+        finally:
+            widget.config(state='disabled')
+
+    def _apply(self, rows):
+        widget = self.widget
+        new_order = [item_id for item_id, _, _ in rows]
+        new_index = {item_id: i for i, item_id in enumerate(new_order)}
+
+        # Rows that stay in the same relative order are left where they are;
+        # every other row (gone, or moved) is deleted, bottom-up so line numbers hold
+        old_positions = [new_index.get(item_id, -1) for item_id in self.order]
+        present = [i for i, pos in enumerate(old_positions) if pos >= 0]
+        keep = {present[k] for k in stable_positions([old_positions[i] for i in present])}
+        for line in range(len(self.order) - 1, -1, -1):
+            if line not in keep:
+                widget.delete(f"{line + 1}.0", f"{line + 2}.0")
+                item_id = self.order.pop(line)
+                if item_id not in new_index:
+                    del self.rows[item_id]
+                else:
+                    # Moved rows are re-inserted below with their new text
+                    self.rows.pop(item_id, None)
+                self.line_writes += 1
+
+        # self.order is now a subsequence of new_order: insert the missing rows, update the rest
+        for line, (item_id, text, tag) in enumerate(rows):
+            if line < len(self.order) and self.order[line] == item_id:
+                if self.rows[item_id] != (text, tag):
+                    widget.delete(f"{line + 1}.0", f"{line + 1}.end")
+                    widget.insert(f"{line + 1}.0", text, tag)
+                    self.rows[item_id] = (text, tag)
+                    self.line_writes += 1
+            else:
+                widget.insert(f"{line + 1}.0", text + "\n", tag)
+                self.order.insert(line, item_id)
+                self.rows[item_id] = (text, tag)
+                self.line_writes += 1
@@ -5,11 +5,10 @@ scanning for a bag refresh (sort action) in the game logs, using BagMgr@:InitBag
 """
 
 import time
+from startup import PhaseTimer, find_game_logs, DEFAULT_LOG
+# Startup phases are timed from here; see run_startup_tasks()
+startup_timer = PhaseTimer()
 from datetime import datetime
-import psutil
-import win32gui
-import win32process
-import win32api
 import tkinter
 from tkinter import messagebox, BitmapImage, Label, Button
 import threading
@@ -24,6 +23,21 @@ import sys
 import os
 import shutil
 import uuid
+from bag_recovery import reconstruct_bag
+from catalog import ItemCatalog
+from config_store import ConfigStore, DEFAULT_CONFIG
+from drop_journal import DropJournal
+from drop_panel import DropPanel, GAIN_TAG, LOSS_TAG
+from session_store import SessionStore
+from log_parser import parse_log_chunk
+from perf_stats import PerfRecorder
+from metrics_server import MetricsServer, MetricsSnapshot
+from clients import GameClient, AggregateView, ClientPoller
+from lag_monitor import LagMonitor
+from reverse_reader import tail_lines
+from tracker import collect_price_updates
+from ui_pump import UiUpdatePump
+# psutil / pywin32 are imported lazily by startup.find_game_logs() on the startup thread
 
 def resource_path(relative_path):
     """Get the correct path to a resource, whether running as script or bundled."""
@@ -36,16 +50,8 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
     
-# Initialize configuration
-if not os.path.exists("config.json"):
-    with open(resource_path("config.json"), "w", encoding="utf-8") as f:
-        config_data = {
-            "opacity": 1.0,
-            "tax": 0,
-            "user": "",
-            "standalone": False
-        }
-        json.dump(config_data, f, ensure_ascii=False, indent=4)
+# Initialize configuration: settings live in memory, config.json is written on a debounce
+config = ConfigStore(resource_path("config.json"), DEFAULT_CONFIG).load()
 
 # Initialize translation mapping
 if not os.path.exists("translation_mapping.json"):
@@ -54,17 +60,41 @@ if not os.path.exists("translation_mapping.json"):
         translation_mapping = {}
         json.dump(translation_mapping, f, ensure_ascii=False, indent=4)
 
-config_data = {}
 
-# Track bag state and initialization status
-bag_state = {}
-bag_initialized = False
-first_scan = True
+# Shared in-memory copy of full_table.json (reloaded only when the file changes)
+item_catalog = ItemCatalog(resource_path("full_table.json"), compile=True)
 
-# Initialize button state
-awaiting_initialization = False
-initialization_complete = False
-initialization_in_progress = False
+# Per-stage timings of the hot path; recording starts when the Perf panel is opened
+# (or at startup with "perf_stats": true in config.json)
+perf = PerfRecorder(enabled=bool(config.get("perf_stats", False)))
+
+def new_client(log_path, name):
+    """A GameClient (tailer, price-check parser, TrackerSession) for one game log"""
+    client = GameClient(log_path, item_catalog, name)
+    client.session.perf = perf
+    client.session.tax = config.get("tax", 0) == 1
+    client.session.configure_rates(config.get("rate_windows", [300, 900, 3600]), config.get("rate_last_maps", 10))
+    client.lag = LagMonitor(config.get("lag_warn_seconds", 5), config.get("lag_warn_mb", 4) * 1048576)
+    return client
+
+# One client per running game; run_startup_tasks() points the first at the discovered log
+# and adds one for every other game window it finds
+clients = [new_client(DEFAULT_LOG, "Client 1")]
+# Index into clients of the client shown in the main window, or None for all of them summed
+shown_index = 0
+
+def shown_clients():
+    return list(clients) if shown_index is None else [clients[shown_index]]
+
+def shown_session():
+    """The TrackerSession the main window shows (an AggregateView for "All clients")"""
+    if shown_index is None:
+        return AggregateView(c.session for c in clients)
+    return clients[shown_index].session
+
+def primary_client():
+    """The shown client, or the first one while all are shown"""
+    return clients[shown_index or 0]
 
 # Global flag to stop background threads
 app_running = True
@@ -83,67 +113,30 @@ def save_translation_mapping(mapping):
     with open(resource_path("translation_mapping.json"), "w", encoding="utf-8") as f:
         json.dump(mapping, f, ensure_ascii=False, indent=4)
 
-def get_price_info(text):
+def get_price_info(price_records):
+    """Update full_table.json prices from the price checks parsed out of a log chunk"""
     try:
-        pattern_id = r'XchgSearchPrice----SynId = (\d+).*?\+refer \[(\d+)\]'
-        match = re.findall(pattern_id, text, re.DOTALL)
-        result = list(match)
-        for i, item in enumerate(result, 1):
-            ids = item[1]
-            synid = item[0]
-            pattern = re.compile(
-                rf'----Socket RecvMessage STT----XchgSearchPrice----SynId = {synid}\s+'  # Match target SynId
-                r'\[.*?\]\s*GameLog: Display: \[Game\]\s+'  # Match time and fixed prefix
-                r'(.*?)(?=----Socket RecvMessage STT----|$)',  # Match data block content (to the next data block or end)
-                re.DOTALL  # Allow . to match newlines
-            )
-
-            # Find target data block
-            match = pattern.search(text)
-            if not match:
-                print(f'Record found: ID:{item[1]}, Price:-1')
-                continue
-                
-            data_block = match.group(1)
-            if int(item[1]) == 100300:
-                continue
-                
-            # Extract all +number [value] values (ignore currency)
-            value_pattern = re.compile(r'\+\d+\s+\[([\d.]+)\]')  # Match +number [x.x] format
-            values = value_pattern.findall(data_block)
-            # Get the average of the first 30 values, or all if there are fewer than 30
-            if len(values) == 0:
-                average_value = -1
-            else:
-                num_values = min(len(values), 30)
-                sum_values = sum(float(values[i]) for i in range(num_values))
-                average_value = sum_values / num_values
-            # If no usable samples were found, skip updating the price
-            if average_value < 0:
-                print(f'Record found: ID:{ids}, no price samples')
-                continue
+        # Average each check's samples; all prices from the chunk are written back in one batch
+        price_updates = collect_price_updates(price_records)
 
-            try:
-                with open(resource_path("full_table.json"), 'r', encoding="utf-8") as f:
-                    full_table = json.load(f)
-                if ids in full_table:
-                    full_table[ids]['last_time'] = round(time.time())
-                    full_table[ids]['from'] = "FurryHeiLi"
-                    full_table[ids]['price'] = round(average_value, 4)
-                    with open(resource_path("full_table.json"), 'w', encoding="utf-8") as f:
-                        json.dump(full_table, f, indent=4, ensure_ascii=False)
-                    print(f'Updating item value: ID:{ids}, Name:{full_table[ids].get("name","<unknown>")}, Price:{round(average_value, 4)}')
-                    # Schedule UI refresh on main thread so updated prices show immediately
-                    try:
-                        root.after(0, lambda: root.reshow())
-                    except Exception:
-                        pass
-                else:
-                    print(f'Record found: ID:{ids} not present in full_table.json')
-            except Exception as e:
-                print(f'Failed to update price for ID:{ids}: {e}')
-
-            price_submit(ids, round(average_value, 4), get_user())
+        if not price_updates:
+            return
+        if session_store:
+            session_store.record_prices(price_records, price_updates, "FurryHeiLi")
+        try:
+            updated = item_catalog.update_prices(price_updates, "FurryHeiLi")
+        except Exception as e:
+            print(f'Failed to update prices for IDs:{list(price_updates)}: {e}')
+            return
+        for ids, price in price_updates.items():
+            if ids in updated:
+                print(f'Updating item value: ID:{ids}, Name:{item_catalog.name(ids, "<unknown>")}, Price:{price}')
+            else:
+                print(f'Record found: ID:{ids} not present in full_table.json')
+            price_submit(ids, price, get_user())
+        # Request a UI refresh on the main thread so updated prices show on the next frame
+        if updated:
+            ui_updates.request("reshow", root.reshow)
     except Exception as e:
         print(e)
 
@@ -153,6 +146,13 @@ def apply_local_overrides():
     Prices in `full_table.json` are authoritative for standalone mode. This function no longer
     reads or applies `price.json` — edit `full_table.json` directly to change prices.
     """
+    # Hold the catalog lock so a price batch from the log thread cannot interleave
+    # with this read-modify-write of full_table.json
+    with item_catalog.lock:
+        _apply_local_overrides()
+
+def _apply_local_overrides():
+    """Body of apply_local_overrides(); the caller holds item_catalog.lock"""
     if not os.path.exists("full_table.json"):
         return
     with open(resource_path("full_table.json"), 'r', encoding="utf-8") as f:
@@ -217,74 +217,19 @@ def apply_local_overrides():
             shutil.copyfile("full_table.json", "full_table.json.bak")
         except Exception:
             pass
-        with open(resource_path("full_table.json"), 'w', encoding="utf-8") as f:
-            json.dump(full, f, indent=4, ensure_ascii=False)
+        item_catalog.save(full)
         print("Applied local overrides to full_table.json")
 
-def initialize_bag_state(text):
-    """Initialize the bag state by scanning all current items (legacy method)"""
-    global bag_state, bag_initialized, first_scan
-    
-    if not first_scan:
-        return False  # Only try to initialize on the first scan
-    
-    first_scan = False
-    
-    # Try to find initialization marker
-    if "PlayerInitPkgMgr" in text or "Login2Client" in text:
-        print("Detected player login or initialization - resetting bag state")
-        bag_state.clear()
-        return True
-    
-    # Pattern to match all bag items
-    pattern = r'\[.*?\]\[.*?\]GameLog: Display: \[Game\] BagMgr@:Modfy BagItem PageId = (\d+) SlotId = (\d+) ConfigBaseId = (\d+) Num = (\d+)'
-    matches = re.findall(pattern, text)
-    
-    if len(matches) > 10:  # Assume we found a big batch of items - good for initialization
-        print(f"Found {len(matches)} bag items - initializing bag state")
-        for match in matches:
-            page_id, slot_id, config_base_id, num = match
-            # Create a unique key for this item slot
-            item_key = f"{page_id}:{slot_id}:{config_base_id}"
-            num = int(num)
-            # Update the bag state
-            bag_state[item_key] = num
-            
-        bag_initialized = True
-        # Treat this as a complete initialization so downstream code doesn't
-        # misinterpret the first observed snapshot as drops.
-        try:
-            # Build totals and store as init: keys
-            item_totals = {}
-            for key, qty in bag_state.items():
-                if ":" not in key:
-                    continue
-                parts = key.split(":")
-                if len(parts) != 3:
-                    continue
-                _, _, item_id = parts
-                item_totals[item_id] = item_totals.get(item_id, 0) + qty
-            for item_id, total in item_totals.items():
-                bag_state[f"init:{item_id}"] = total
-        except Exception:
-            pass
-        initialization_complete = True
-        return True
-    
-    return False
-
 def start_initialization():
     """Start the initialization process by scanning for bag reset in the logs"""
-    global awaiting_initialization, initialization_in_progress, root
+    global root
     
-    if initialization_in_progress:
+    # Set the flag to await initialization on every client shown
+    started = [client.session.start_initialization() for client in shown_clients()]
+    if not any(started):
         messagebox.showinfo("Initialization", "Initialization already in progress. Please wait.")
         return
     
-    # Set the flag to await initialization
-    awaiting_initialization = True
-    initialization_in_progress = True
-    
     # Update the UI to show we're waiting
     root.label_initialize_status.config(text="Waiting for bag update...",
                                        foreground="blue")
@@ -295,240 +240,14 @@ def start_initialization():
                        "Click 'OK' and then sort your bag in-game by clicking the sort button.\n\n"
                        "This will refresh your inventory and allow the tracker to initialize with the correct item counts.")
 
-def process_initialization(text):
-    """Process the log text for initialization by scanning for BagMgr@:InitBagData entries"""
-    global bag_state, bag_initialized, awaiting_initialization, initialization_complete, initialization_in_progress, root
-    
-    if not awaiting_initialization:
-        return False
-    
-    # Pattern to match BagMgr@:InitBagData entries (complete inventory data)
-    pattern = r'\[.*?\]GameLog: Display: \[Game\] BagMgr@:InitBagData PageId = (\d+) SlotId = (\d+) ConfigBaseId = (\d+) Num = (\d+)'
-    matches = re.findall(pattern, text)
-    
-    # Only proceed if we found a significant number of entries
-    if len(matches) < 20:
-        return False
-    
-    print(f"Found {len(matches)} BagMgr@:InitBagData entries - initializing bag state")
-    
-    # Clear any existing bag state
-    bag_state.clear()
-    
-    # Dictionary to track item totals (by ConfigBaseId)
-    item_totals = {}
-    
-    # Process all matches to get the complete bag state
-    for match in matches:
-        page_id, slot_id, config_base_id, count = match
-        count = int(count)
-        
-        # Store both the slot-based entry and update the total
-        slot_key = f"{page_id}:{slot_id}:{config_base_id}"
-        bag_state[slot_key] = count
-        
-        # Track totals by item ID
-        if config_base_id not in item_totals:
-            item_totals[config_base_id] = 0
-        item_totals[config_base_id] += count
-    
-    # Store the totals in the bag state with a special prefix
-    for item_id, total in item_totals.items():
-        init_key = f"init:{item_id}"
-        bag_state[init_key] = total
-    
-    # Only consider initialization successful if we found items
-    if matches:
-        print(f"Successfully initialized {len(item_totals)} unique item types across {len(matches)} inventory slots")
-        bag_initialized = True
-        initialization_complete = True
-        awaiting_initialization = False
-        initialization_in_progress = False
-        
-        # Update UI in the main thread
-        root.after(0, lambda: root.label_initialize_status.config(
-            text=f"Initialized {len(item_totals)} items",
-            foreground="green"))
-        root.after(0, lambda: root.button_initialize.config(state="normal"))
-        
-        return True
-    
-    return False
-
-def detect_bag_changes(text):
-    """Detect changes to the bag and calculate both gains and losses"""
-    global bag_state, bag_initialized
-    
-    # If bag isn't initialized yet, we can't detect changes properly
-    if not bag_initialized:
-        return []
-    
-    # Pattern to match bag item modifications
-    pattern = r'\[.*?\]GameLog: Display: \[Game\] BagMgr@:Modfy BagItem PageId = (\d+) SlotId = (\d+) ConfigBaseId = (\d+) Num = (\d+)'
-    matches = re.findall(pattern, text)
-    
-    if not matches:
-        return []
-    
-    changes = []
-    slot_changes = {}
-    
-    # Process all matches to calculate item changes
-    for match in matches:
-        page_id, slot_id, config_base_id, count = match
-        count = int(count)
-        
-        # Check previous value in this slot
-        slot_key = f"{page_id}:{slot_id}:{config_base_id}"
-        prev_count = bag_state.get(slot_key, 0)
-        
-        # Update the bag state
-        bag_state[slot_key] = count
-        
-        # Track changes by item ID
-        if config_base_id not in slot_changes:
-            slot_changes[config_base_id] = 0
-        
-        # Track the change in this slot
-        slot_changes[config_base_id] += (count - prev_count)
-    
-    # Now compare with initial values to see net changes
-    for item_id, slot_change in slot_changes.items():
-        if slot_change == 0:
-            continue
-            
-        init_key = f"init:{item_id}"
-        initial_total = bag_state.get(init_key, 0)
-        
-        # Calculate current total by summing all slots for this item
-        current_total = 0
-        for key, value in bag_state.items():
-            if key.startswith("init:"):
-                continue
-            parts = key.split(':')
-            if len(parts) == 3 and parts[2] == item_id:
-                current_total += value
-        
-        # Calculate net change from initial state
-        net_change = current_total - initial_total
-        
-        if net_change != 0:
-            changes.append((item_id, net_change))
-            
-            # Update the baseline to current total for this item
-            # This ensures subsequent changes are measured from the new baseline
-            bag_state[init_key] = current_total
-    
-    return changes
-
-def scan_for_bag_changes(text):
-    """Enhanced bag change scanner that handles initialization"""
-    global bag_initialized, awaiting_initialization
-    
-    # Check if we're in initialization mode and process accordingly
-    if awaiting_initialization:
-        if process_initialization(text):
-            return []  # Skip drop detection during initialization
-    
-    # If bag is properly initialized, use the new tracking method
-    if bag_initialized and initialization_complete:
-        return detect_bag_changes(text)
-    
-    # If bag isn't initialized yet, use the old method
-    if not bag_initialized:
-        # Use the original initialization method as fallback
-        if initialize_bag_state(text):
-            return []
-        
-    # Legacy method for tracking changes if not properly initialized
-    pattern = r'\[.*?\]\[.*?\]GameLog: Display: \[Game\] BagMgr@:Modfy BagItem PageId = (\d+) SlotId = (\d+) ConfigBaseId = (\d+) Num = (\d+)'
-    matches = re.findall(pattern, text)
-    
-    if not matches:
-        return []
-        
-    drops = []
-    
-    # Track total counts of each item type before this update
-    previous_totals = {}
-    for item_key, qty in bag_state.items():
-        if ":" not in item_key:
-            continue
-        parts = item_key.split(':')
-        if len(parts) != 3:
-            continue
-        _, _, item_id = parts
-        if item_id not in previous_totals:
-            previous_totals[item_id] = 0
-        previous_totals[item_id] += qty
-    
-    # Process all matches first to get the current state
-    current_state = bag_state.copy()
-    for match in matches:
-        page_id, slot_id, config_base_id, num = match
-        # Create a unique key for this item slot
-        item_key = f"{page_id}:{slot_id}:{config_base_id}"
-        num = int(num)
-        
-        # Update the current state
-        current_state[item_key] = num
-    
-    # Now compute total counts after the update
-    current_totals = {}
-    for item_key, qty in current_state.items():
-        if ":" not in item_key:
-            continue
-        parts = item_key.split(':')
-        if len(parts) != 3:
-            continue
-        _, _, item_id = parts
-        if item_id not in current_totals:
-            current_totals[item_id] = 0
-        current_totals[item_id] += qty
-    
-    # If we had no previous totals (likely first scan), treat this snapshot as baseline
-    if sum(previous_totals.values()) == 0 and sum(current_totals.values()) > 0:
-        # Avoid large false-positive drops on first observed update
-        bag_state.update(current_state)
-        return []
-
-    # Compare total counts to detect drops, even across stacks
-    for item_id, current_total in current_totals.items():
-        previous_total = previous_totals.get(item_id, 0)
-        if current_total > previous_total:
-            # We got more of this item
-            drops.append((item_id, current_total - previous_total))
-    
-    # Update the bag state
-    bag_state.update(current_state)
-    
-    return drops
-
-def detect_map_change(text):
-    """Detect entering or leaving a map from the log text"""
-    # Pattern to match entering a map from the refuge
-    enter_pattern = r"PageApplyBase@ _UpdateGameEnd: LastSceneName = World'/Game/Art/Maps/01SD/XZ_YuJinZhiXiBiNanSuo200/XZ_YuJinZhiXiBiNanSuo200.XZ_YuJinZhiXiBiNanSuo200' NextSceneName = World'/Game/Art/Maps"
-    
-    # Pattern to match returning to the refuge
-    exit_pattern = r"NextSceneName = World'/Game/Art/Maps/01SD/XZ_YuJinZhiXiBiNanSuo200/XZ_YuJinZhiXiBiNanSuo200.XZ_YuJinZhiXiBiNanSuo200'"
-    
-    entering_map = bool(re.search(enter_pattern, text))
-    exiting_map = bool(re.search(exit_pattern, text))
-    
-    return entering_map, exiting_map
-
 def get_user():
     """Return local user ID (standalone only)"""
-    with open(resource_path("config.json"), "r", encoding="utf-8") as f:
-        config_data = json.load(f)
-
-    # If no user ID exists, generate one
-    if not config_data.get("user"):
-        config_data["user"] = str(uuid.uuid4())
-        with open(resource_path("config.json"), "w", encoding="utf-8") as f:
-            json.dump(config_data, f, ensure_ascii=False, indent=4)
+    # If no user ID exists, generate one and persist it right away
+    if not config.get("user"):
+        config.set("user", str(uuid.uuid4()))
+        config.save()
 
-    return config_data["user"]
+    return config["user"]
 
 def price_submit(ids, price, user):
     """Standalone stub — skip network price submission."""
@@ -561,209 +280,196 @@ def initialize_data_files():
     except Exception as e:
         print(f"Failed to apply local overrides: {e}")
 
-# Track bag state and initialization status
-bag_state = {}
-bag_initialized = False
-first_scan = True
-
 all_time_passed = 1
 
-# Try to find the game and log file
+# The games and their logs are looked up on the startup thread (run_startup_tasks);
+# until then the default log path is used
 game_found = False
-try:
-    hwnd = win32gui.FindWindow(None, "Torchlight: Infinite  ")
-    if hwnd:
-        tid, pid = win32process.GetWindowThreadProcessId(hwnd)
-        process = psutil.Process(pid)
-        position_game = process.exe()
-        position_log = position_game + "/../../../TorchLight/Saved/Logs/UE_game.log"
-        position_log = position_log.replace("\\", "/")
-        print(f"Log file location: {position_log}")
-        with open(position_log, "r", encoding="utf-8") as f:
-            print(f"Successfully opened log file, first 100 characters: {f.read(100)}")
-            # Go to the end of the file
-            f.seek(0, 2)
+
+def run_startup_tasks():
+    """Slow startup work, run on a background thread once the window is up"""
+    global game_found, session_store, log_thread, shown_index
+
+    set_startup_status("Loading item data...")
+    initialize_data_files()
+    startup_timer.mark("data files")
+    try:
+        item_catalog.refresh()
+    except Exception as e:
+        print(f"Error loading item data: {e}")
+    startup_timer.mark("catalog")
+
+    set_startup_status("Looking for the game...")
+    found_logs, error = find_game_logs()
+    if found_logs:
         game_found = True
-except Exception as e:
-    print(f"Error finding game: {e}")
-    # Use a default log path as fallback
-    position_log = "UE_game.log"
-    
-if not game_found:
-    messagebox.showwarning("Game Not Found", 
+        clients[0].set_log(found_logs[0])
+        for n, path in enumerate(found_logs[1:], start=2):
+            clients.append(new_client(path, f"Client {n}"))
+        if len(clients) > 1:
+            # Several games running: start with their combined numbers
+            shown_index = None
+            ui_updates.post(root.update_client_choices)
+    else:
+        print(f"Error finding game: {error}")
+    startup_timer.mark("game discovery")
+
+    # Sessions, map runs, drops and price checks are also kept in SQLite for history queries ("" disables)
+    if config.get("history_db", "tracker.db"):
+        try:
+            store = SessionStore(config.get("history_db", "tracker.db")).start()
+            for client in clients:
+                client.store_session_id = store.begin_session(client.log_path, config.get("tax", 0) == 1,
+                                                              current=False)
+            session_store = store
+        except Exception as e:
+            print(f"History database unavailable: {e}")
+    startup_timer.mark("history db")
+
+    # Start the log reading thread
+    log_thread = MyThread()
+    log_thread.start()
+    startup_timer.mark("log thread")
+    startup_timer.report()
+
+    if game_found:
+        set_startup_status(tracking_status(), "green")
+    else:
+        set_startup_status("Game not found", "#b20000")
+        ui_updates.post(lambda: messagebox.showwarning("Game Not Found", 
                         "Could not find Torchlight: Infinite game process or log file. "\
                         "The tool will continue running but won't be able to track drops until the game is started.\n\n"\
-                        "Please make sure the game is running with logging enabled, then restart this tool.")
+                        "Please make sure the game is running with logging enabled, then restart this tool."))
 
-exclude_list = []
-pending_items = {}
-
-def process_drops(drops, item_id_table, price_table):
-    """Process detected drops and consumption, update statistics"""
-    global income, income_all, drop_list, drop_list_all, config_data
-    
-    # First, consolidate multiple changes to the same item in this batch
-    consolidated_changes = {}
-    for change in drops:
-        item_id, amount = change
-        item_id = str(item_id)
-        if item_id not in consolidated_changes:
-            consolidated_changes[item_id] = 0
-        consolidated_changes[item_id] += amount
-    
-    # Now process the consolidated changes
-    for item_id, amount in consolidated_changes.items():
-        # Check if we have a name for this item
-        if item_id in item_id_table:
-            item_name = item_id_table[item_id]
-        else:
-            # No item name found, use ID as name and add to pending queue
-            item_name = f"Unknown item (ID: {item_id})"
-            if item_id not in pending_items:
-                print(f"[NETWORK] ID {item_id} doesn't exist locally, fetching")
-                pending_items[item_id] = amount
-            else:
-                pending_items[item_id] += amount
-                print(f"[NETWORK] ID {item_id} already in queue, accumulated: {pending_items[item_id]}")
-            continue
-            
-        # Check exclusion list
-        if exclude_list and item_name in exclude_list:
-            print(f"Excluded: {item_name} x{amount}")
-            continue
-            
-        # Update counters (positive for gains, negative for consumption)
-        if item_id not in drop_list:
-            drop_list[item_id] = 0
-        drop_list[item_id] += amount
-
-        if item_id not in drop_list_all:
-            drop_list_all[item_id] = 0
-        drop_list_all[item_id] += amount
-        
-        # Calculate price impact
-        price = 0.0
-        if item_id in price_table:
-            price = price_table[item_id]
-            if config_data.get("tax", 0) == 1 and item_id != "100300":
-                price = price * 0.875
-            # Amount can be positive (gain) or negative (consumption)
-            income += price * amount
-            income_all += price * amount
-            
-            # If this is consumption (negative amount), immediately update the UI
-            if amount < 0:
-                root.reshow()
-            
-        # Log to drop.txt
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def close_session_store():
+    """Mark every client's history session ended and flush what is queued"""
+    if not session_store:
+        return
+    for client in clients:
+        session_store.end_session(session_id=client.store_session_id)
+        client.store_session_id = None
+    session_store.close()
+
+def shutdown():
+    """Stop the log thread, then flush and close everything still queued (once, after the Tk loop ends)"""
+    global app_running
+    app_running = False
+    if log_thread is not None:
+        # Waits for the chunks in flight, so their drops and history rows are not lost
+        log_thread.join(timeout=5)
+    drop_journal.close()
+    close_session_store()
+    if metrics_server:
+        metrics_server.close()
+    config.close()
+
+def tracking_status():
+    if len(clients) > 1:
+        return f"Tracking {len(clients)} game clients"
+    return f"Tracking {os.path.basename(clients[0].log_path)}"
+
+def set_startup_status(text, color="blue"):
+    ui_updates.post(lambda: root.label_startup_status.config(text=text, foreground=color))
+
+def log_drops(drop_events):
+    """Print processed drops and queue them for drop.txt"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log_lines = []
+    for item_id, item_name, amount, price in drop_events:
         if amount > 0:
-            log_line = f"[{timestamp}] Drop: {item_name} x{amount} ({round(price, 3)}/each)\n"
+            log_lines.append(f"[{timestamp}] Drop: {item_name} x{amount} ({round(price, 3)}/each)\n")
         else:
-            log_line = f"[{timestamp}] Consumed: {item_name} x{abs(amount)} ({round(price, 3)}/each)\n"
-        with open("drop.txt", "a", encoding="utf-8") as f:
-            f.write(log_line)
-            
+            log_lines.append(f"[{timestamp}] Consumed: {item_name} x{abs(amount)} ({round(price, 3)}/each)\n")
+
         if amount > 0:
             print(f"Processed drop: {item_name} x{amount} ({round(price, 3)}/each)")
         else:
             print(f"Processed consumption: {item_name} x{abs(amount)} ({round(price, 3)}/each)")
 
-def reset_map_baseline():
-    """Reset the baseline for map tracking to current inventory state"""
-    global bag_state
-    
-    # Calculate current totals for all items
-    item_totals = {}
-    for key, value in bag_state.items():
-        if not key.startswith("init:") and ":" in key:
-            parts = key.split(':')
-            if len(parts) == 3:
-                item_id = parts[2]
-                if item_id not in item_totals:
-                    item_totals[item_id] = 0
-                item_totals[item_id] += value
-    
-    # Update the init keys to current totals
-    for item_id, total in item_totals.items():
-        init_key = f"init:{item_id}"
-        bag_state[init_key] = total
-    
-    print(f"Reset map baseline for {len(item_totals)} items")
+    # The whole batch goes to the journal in one call; its writer thread does the file I/O
+    drop_journal.write_many(log_lines)
 
-def deal_change(changed_text):
+def deal_change(client, chunk):
+    """Apply a parsed log chunk to a client's session and update the UI with the result"""
     global root
-    global is_in_map, all_time_passed, drop_list, income, t, drop_list_all, income_all, total_time, map_count
     
-    # Check if entering/leaving maps based on scene changes
-    entering_map, exiting_map = detect_map_change(changed_text)
+    now = time.time()
+    session = client.session
+    result = session.process_chunk(chunk, now)
+    if session_store:
+        session_store.record_chunk(session, result, now, client.store_session_id)
+    # Other clients' changes only reach the window when it shows them
+    if client not in shown_clients():
+        if result.drops:
+            log_drops(result.drops)
+        return
     
-    if entering_map:
-        is_in_map = True
-        drop_list = {}
-        income = 0  # Start fresh for this map, costs will be tracked automatically
-        map_count += 1
-        
-        # Reset baseline when entering a map - snapshot current state as starting point
-        # This needs to happen BEFORE processing any bag changes from this log batch
-        reset_map_baseline()
-        
-    if exiting_map:
-        is_in_map = False
-        total_time += time.time() - t
+    if result.initialized:
+        item_count = result.initialized
+        # Update UI in the main thread
+        ui_updates.post(lambda: root.label_initialize_status.config(
+            text=f"Initialized {item_count} items",
+            foreground="green"))
+        ui_updates.post(lambda: root.button_initialize.config(state="normal"))
     
-    # Load item data and prices
-    id_table = {}
-    price_table = {}
+    if result.drops:
+        log_drops(result.drops)
+        # Many chunks in one frame still cause a single reshow
+        ui_updates.request("reshow", root.reshow)
+
+def restore_bag_from_log(client, end):
+    """Rebuild a client's bag from the last InitBagData snapshot and later Modfy lines before `end`"""
+    session = client.session
+    if not config.get("restore_bag", True) or session.bag_initialized:
+        return
     try:
-        with open(resource_path("full_table.json"), 'r', encoding="utf-8") as f:
-            f_data = json.load(f)
-            for i in f_data.keys():
-                id_table[str(i)] = f_data[i]["name"]
-                price_table[str(i)] = f_data[i]["price"]
+        recovery = reconstruct_bag(client.log_path, end,
+                                   max_bytes=config.get("restore_bag_max_mb", 256) * 1048576)
     except Exception as e:
-        print(f"Error loading item data: {e}")
+        print(f"Could not rebuild bag from log: {e}")
         return
-    
-    # Scan for bag changes (drops) - this will use the baseline set above if we just entered a map
-    drops = scan_for_bag_changes(changed_text)
-    if drops:
-        process_drops(drops, id_table, price_table)
-        root.reshow()
-        if not is_in_map:
-            is_in_map = True
+    if recovery is None:
+        print("No bag snapshot found in the log - click Initialize and sort your bag")
+        return
+    item_count = session.restore_bag(recovery.bag)
+    print(f"[{client.name}] Rebuilt bag from log: {item_count} item types from {recovery.snapshot_entries} slots "
+          f"+ {recovery.modifications} changes, {recovery.bytes_scanned / 1048576:.1f} MB "
+          f"in {recovery.elapsed * 1000:.0f} ms")
+    if client in shown_clients():
+        ui_updates.post(lambda: root.label_initialize_status.config(
+            text=f"Restored {item_count} items from log",
+            foreground="green"))
+
+def is_debug_line(line):
+    """Lines related to bag changes or map changes"""
+    return "BagMgr" in line or "PageApplyBase" in line or "ItemChange@" in line or "XZ_YuJinZhiXiBiNanSuo200" in line
 
 # Debug function to examine log format and bag state
 def debug_log_format():
     """Print recent log entries and current bag state to help diagnose issues"""
     try:
-        print("=== CURRENT BAG STATE ===")
-        print(f"Initialized: {bag_initialized}")
-        print(f"Initialization complete: {initialization_complete}")
+        client = primary_client()
+        session = client.session
+        print(f"=== CURRENT BAG STATE ({client.name}) ===")
+        bag_state = session.bag_state
+        print(f"Initialized: {session.bag_initialized}")
+        print(f"Initialization complete: {session.initialization_complete}")
         print(f"Total tracked slots: {len(bag_state)}")
+        for c in clients:
+            print(f"Log tailer ({c.name}): {c.tailer.stats()}")
         
-        # Group by item ID for better display
-        grouped = {}
-        for key, amount in bag_state.items():
-            if key.startswith("init:"):
-                item_id = key.split(':')[1]
-            elif ":" in key and len(key.split(':')) == 3:
-                _, _, item_id = key.split(':')
-            else:
-                item_id = key
-                
-            if item_id not in grouped:
-                grouped[item_id] = 0
-            grouped[item_id] += amount
+        # Per-item totals are maintained by the bag state; copied under the session lock
+        # because the parse workers keep applying chunks while this runs on the Tk thread
+        grouped = session.bag_totals()
         
         # Load item names if available
         try:
-            with open(resource_path("full_table.json"), 'r', encoding="utf-8") as f:
-                item_data = json.load(f)
+            item_catalog.refresh()
+            item_names = item_catalog.names
             
             print("Item totals:")
             for item_id, total in grouped.items():
-                name = item_data.get(item_id, {}).get("name", f"Unknown (ID: {item_id})")
+                name = item_names.get(item_id, f"Unknown (ID: {item_id})")
                 print(f"  {name}: {total}")
         except:
             print("Item IDs and totals:")
@@ -771,20 +477,18 @@ def debug_log_format():
                 print(f"  ID {item_id}: {total}")
                 
         print("\n=== RECENT LOG ENTRIES ===")
-        with open(position_log, "r", encoding="utf-8") as f:
-            # Get the last 50 lines of the log
-            lines = f.readlines()[-50:]
-            for line in lines:
-                # Only print lines related to bag changes or map changes
-                if "BagMgr" in line or "PageApplyBase" in line or "ItemChange@" in line or "XZ_YuJinZhiXiBiNanSuo200" in line:
-                    print(line.strip())
+        # Read backwards from the end of the log for the last 50 lines related to bag or
+        # map changes; at most the last 8 MB are scanned however long the game has run
+        lines = tail_lines(client.log_path, 50, match=is_debug_line, max_bytes=8 * 1024 * 1024)
+        for line in lines:
+            print(line.strip())
         print("=== END OF DEBUG INFO ===")
         
         # Show in a dialog
         messagebox.showinfo("Debug Information", 
                         f"Debug information has been printed to the console.\n\n"
-                        f"Bag state initialized: {bag_initialized}\n"
-                        f"Initialization complete: {initialization_complete}\n"
+                        f"Bag state initialized: {session.bag_initialized}\n"
+                        f"Initialization complete: {session.initialization_complete}\n"
                         f"Total items tracked: {len(grouped)}\n"
                         f"Total inventory slots: {len(bag_state)}")
     except Exception as e:
@@ -792,15 +496,7 @@ def debug_log_format():
         import traceback
         traceback.print_exc()
 
-is_in_map = False
-drop_list = {}
-drop_list_all = {}
-income = 0
-income_all = 0
-t = time.time()
 show_all = False
-total_time = 0
-map_count = 0
 
 class App(Tk):
     show_type = ["Compass","Currency","Special Item","Memory Material","Equipment Material","Gameplay Ticket","Map Ticket","Cube Material","Corruption Material","Dream Material","Tower Material","BOSS Ticket","Memory Glow","Memory Fluorescence","Divine Emblem","Overlap Material","Hard Currency"]
@@ -831,12 +527,7 @@ class App(Tk):
         #style.configure("Red.TFrame", background="#ffcccc")
         #style.configure("Blue.TFrame", background="#ccccff")
         # Load rate unit from config so labels use correct unit initially
-        try:
-            with open(resource_path("config.json"), "r", encoding="utf-8") as _f:
-                _cfg = json.load(_f)
-        except Exception:
-            _cfg = {}
-        _rate_unit = _cfg.get("rate_unit", 1)  # 0 = per minute, 1 = per hour (default to per-hour)
+        _rate_unit = config.get("rate_unit", 1)  # 0 = per minute, 1 = per hour (default to per-hour)
         _unit_text = "/min" if _rate_unit == 0 else "/hr"
 
         label_current_time = ttk.Label(basic_frame, text="Current Map: 0m00s", font=("Arial", 14), anchor="w")
@@ -874,6 +565,9 @@ class App(Tk):
         button_change.grid(row=1, column=3, pady=5)
         button_log = ttk.Button(advanced_frame, text="Log", width=7, cursor="hand2")
         button_log.grid(row=1, column=1, sticky="w", padx=5, pady=5)
+        button_perf = ttk.Button(advanced_frame, text="Perf", width=7, cursor="hand2", command=self.show_perf)
+        button_perf.grid(row=1, column=2, sticky="w", padx=5, pady=5)
+        self.perf_panel = None
         
         # Initialize button
         button_initialize = ttk.Button(basic_frame, text="Initialize", cursor="hand2", command=self.start_initialization)
@@ -882,11 +576,29 @@ class App(Tk):
         # Initialize status label
         label_initialize_status = ttk.Label(basic_frame, text="Not initialized", font=("Arial", 10))
         label_initialize_status.grid(row=1, column=3, padx=5, pady=2)
+
+        # Startup status (item data, game discovery); filled in by run_startup_tasks()
+        label_startup_status = ttk.Label(basic_frame, text="Starting...", font=("Arial", 10), foreground="blue")
+        label_startup_status.grid(row=2, column=0, columnspan=4, padx=5, pady=2, sticky="w")
+        self.label_startup_status = label_startup_status
+
+        # Which game client the window shows; filled in once several games are found
+        combo_client = ttk.Combobox(basic_frame, state="disabled", width=14, values=["Client 1"])
+        combo_client.current(0)
+        combo_client.grid(row=2, column=4, padx=5, pady=2)
+        combo_client.bind("<<ComboboxSelected>>", self.on_client_selected)
+        self.combo_client = combo_client
+
+        # Rolling income rates (last 5/15/60 minutes, last N maps); see update_rolling_rates()
+        label_rolling_rates = ttk.Label(basic_frame, text="", font=("Arial", 10))
+        label_rolling_rates.grid(row=3, column=0, columnspan=5, padx=5, pady=2, sticky="w")
+        self.label_rolling_rates = label_rolling_rates
         
         self.button_initialize = button_initialize
         self.label_initialize_status = label_initialize_status
         
         self.inner_pannel_drop_listbox = inner_pannel_drop_listbox
+        self.drop_panel = DropPanel(inner_pannel_drop_listbox)
         self.inner_pannel_drop_scroll = inner_pannel_drop_scroll
         # track currently displayed item ids (same order as listbox entries)
         self._list_item_ids = []
@@ -909,16 +621,11 @@ class App(Tk):
         self.inner_pannel_settings.geometry('+0+0')
         
         # Create settings controls
-        global config_data
-        # Choose tax or no tax
-        with open(resource_path("config.json"), "r", encoding="utf-8") as f:
-            config_data = f.read()
-        config_data = json.loads(config_data)
         # Tax setting
         label_tax = ttk.Label(self.inner_pannel_settings, text="Tax:")
         label_tax.grid(row=0, column=0, padx=5, pady=5)
         chose = ttk.Combobox(self.inner_pannel_settings, values=["No tax", "Include tax"], state="readonly")
-        chose.current(config_data.get("tax", 0))
+        chose.current(config.get("tax", 0))
         chose.grid(row=0, column=1, padx=5, pady=5)
         self.chose = chose
         chose.bind("<<ComboboxSelected>>", lambda event: self.change_tax(self.chose.current()))
@@ -927,7 +634,7 @@ class App(Tk):
         label_rate = ttk.Label(self.inner_pannel_settings, text="Rate Unit:")
         label_rate.grid(row=0, column=2, padx=5, pady=5)
         rate_choices = ttk.Combobox(self.inner_pannel_settings, values=["Per Minute", "Per Hour"], state="readonly", width=12)
-        rate_choices.current(config_data.get("rate_unit", 1))
+        rate_choices.current(config.get("rate_unit", 1))
         rate_choices.grid(row=0, column=3, padx=5, pady=5)
         self.rate_choice = rate_choices
         rate_choices.bind("<<ComboboxSelected>>", lambda event: self.change_rate_unit(self.rate_choice.current()))
@@ -952,7 +659,7 @@ class App(Tk):
         self.refresh_status_label.grid(row=4, column=0, columnspan=2, padx=5, pady=2, sticky="w")
         
         # Setup default values
-        self.scale_setting_2.set(config_data["opacity"])
+        self.scale_setting_2.set(config["opacity"])
         
         # Create drops panel
         self.inner_pannel_drop = Toplevel(self)
@@ -1007,7 +714,7 @@ class App(Tk):
         self.inner_pannel_settings.protocol("WM_DELETE_WINDOW", self.close_settings)
         
         # Now that all windows are created, set up opacity
-        self.change_opacity(config_data["opacity"])
+        self.change_opacity(config["opacity"])
         
         # Keep all windows on top
         self.attributes('-topmost', True)
@@ -1037,7 +744,9 @@ class App(Tk):
         if messagebox.askyesno("Exit", "Are you sure you want to exit?"):
             global app_running
             app_running = False
-            
+            ui_updates.stop()
+            # The journal, history database and settings are closed by shutdown() once the loop ends
+
             # Close all child windows first
             try:
                 self.inner_pannel_drop.destroy()
@@ -1054,23 +763,14 @@ class App(Tk):
 
     def reset_tracking(self):
         """Reset all tracking data"""
-        global bag_state, bag_initialized, first_scan, drop_list, drop_list_all, income, income_all, total_time, map_count
-        global initialization_complete, awaiting_initialization, initialization_in_progress
-        
         if messagebox.askyesno("Reset Tracking", 
                          "Are you sure you want to reset all tracking data? This will clear all drop statistics."):
-            bag_state.clear()
-            bag_initialized = False
-            initialization_complete = False
-            awaiting_initialization = False
-            initialization_in_progress = False
-            first_scan = True
-            drop_list.clear()
-            drop_list_all.clear()
-            income = 0
-            income_all = 0
-            total_time = 0
-            map_count = 0
+            for client in shown_clients():
+                client.session.reset()
+                if session_store:
+                    session_store.end_session(session_id=client.store_session_id)
+                    client.store_session_id = session_store.begin_session(client.log_path, client.session.tax,
+                                                                          current=False)
             
             # Update UI
             self.label_current_earn.config(text=f"🔥 0")
@@ -1080,29 +780,43 @@ class App(Tk):
                 self.inner_pannel_drop_listbox.config(state='normal')
                 self.inner_pannel_drop_listbox.delete("1.0", END)
                 self.inner_pannel_drop_listbox.config(state='disabled')
+                self.drop_panel.clear()
             except Exception:
                 pass
             self.label_initialize_status.config(text="Not initialized")
             
             messagebox.showinfo("Reset Complete", "All tracking data has been reset.")
             
+    def update_client_choices(self):
+        """List "All clients" and each client in the selector, showing the current choice"""
+        self.combo_client.config(values=["All clients"] + [c.name for c in clients],
+                                 state="readonly" if len(clients) > 1 else "disabled")
+        self.combo_client.current(0 if shown_index is None else shown_index + 1)
+
+    def on_client_selected(self, event=None):
+        global shown_index
+        choice = self.combo_client.current()
+        shown_index = None if choice <= 0 else choice - 1
+        initialized = all(c.session.bag_initialized for c in shown_clients())
+        self.label_initialize_status.config(text="Initialized" if initialized else "Not initialized",
+                                            foreground="green" if initialized else "black")
+        # Every row changes with the client; redraw the panel from scratch
+        self.drop_panel.clear()
+        self.reshow()
+        update_time_labels()
+        update_rolling_rates()
+
     def change_tax(self, value):
-        global config_data
-        with open(resource_path("config.json"), "r", encoding="utf-8") as f:
-            config_data = f.read()
-        config_data = json.loads(config_data)
-        config_data["tax"] = int(value)
-        with open(resource_path("config.json"), "w", encoding="utf-8") as f:
-            json.dump(config_data, f, ensure_ascii=False, indent=4)
+        config.set("tax", int(value))
+
+    def on_tax_changed(self, key, value):
+        # Revalue the drops panel with the new tax setting
+        for client in clients:
+            client.session.tax = value == 1
+        self.reshow()
 
     def change_rate_unit(self, value):
-        global config_data
-        with open(resource_path("config.json"), "r", encoding="utf-8") as f:
-            config_data = f.read()
-        config_data = json.loads(config_data)
-        config_data["rate_unit"] = int(value)
-        with open(resource_path("config.json"), "w", encoding="utf-8") as f:
-            json.dump(config_data, f, ensure_ascii=False, indent=4)
+        config.set("rate_unit", int(value))
 
     def change_states(self):
         global show_all
@@ -1136,12 +850,8 @@ class App(Tk):
             this.withdraw()
 
     def change_opacity(self, value):
-        with open(resource_path("config.json"), "r", encoding="utf-8") as f:
-            config_data = f.read()
-        config_data = json.loads(config_data)
-        config_data["opacity"] = float(value)
-        with open(resource_path("config.json"), "w", encoding="utf-8") as f:
-            json.dump(config_data, f, ensure_ascii=False, indent=4)
+        # Called on every slider motion; the config file is only written once the drag settles
+        config.set("opacity", float(value))
         
         # Apply opacity to main window
         self.attributes('-alpha', float(value))
@@ -1152,34 +862,80 @@ class App(Tk):
         
         if hasattr(self, 'inner_pannel_settings') and self.inner_pannel_settings.winfo_exists():
             self.inner_pannel_settings.attributes('-alpha', float(value))
+    def show_perf(self):
+        """Toggle the performance panel; opening it starts recording stage timings"""
+        if self.perf_panel is not None and self.perf_panel.winfo_exists():
+            if self.perf_panel.state() == "withdrawn":
+                self.perf_panel.deiconify()
+                self.refresh_perf()
+            else:
+                self.perf_panel.withdraw()
+            return
+        perf.enabled = True
+        panel = Toplevel(self)
+        panel.title("Performance")
+        panel.geometry("520x260+0+0")
+        panel.attributes('-topmost', True)
+        panel.attributes('-alpha', config.get("opacity", 1.0))
+        text = Text(panel, height=12, wrap='none', font=("Courier New", 9))
+        text.pack(side="top", fill="both", expand=True)
+        reset = ttk.Button(panel, text="Reset", cursor="hand2", command=perf.reset)
+        reset.pack(side="bottom", pady=4)
+        panel.protocol("WM_DELETE_WINDOW", panel.withdraw)
+        self.perf_panel = panel
+        self.perf_text = text
+        self.refresh_perf()
+
+    def refresh_perf(self):
+        """Redraw the performance table once a second while the panel is visible"""
+        panel = self.perf_panel
+        if panel is None or not panel.winfo_exists() or panel.state() == "withdrawn":
+            return
+        lines = [perf.format_table()]
+        lines.append("")
+        for client in clients:
+            lines.append(f"Tailer ({client.name}): {client.tailer.stats()}")
+            lines.append(f"Lag ({client.name}): {client.lag.stats(time.time())}")
+        lines.append(f"UI pump: {ui_updates.stats()}")
+        self.perf_text.config(state='normal')
+        self.perf_text.delete("1.0", END)
+        self.perf_text.insert("1.0", "\n".join(lines))
+        self.perf_text.config(state='disabled')
+        self.after(1000, self.refresh_perf)
+
     def reshow(self):
-        global drop_list, drop_list_all
-        with open(resource_path("full_table.json"), 'r', encoding="utf-8") as f:
-            full_table = json.load(f)
-        self.label_map_count.config(text=f"🎫 {map_count}")
+        t = perf.clock()
+        try:
+            item_catalog.refresh()
+        except Exception as e:
+            print(f"Error loading item data: {e}")
+        # All three from the same table version: the startup and price threads may swap it meanwhile
+        names, types, last_update = item_catalog.columns()
+        session = shown_session()
+        # Tax-adjusted values by int id; only rebuilt when tax or the catalog changes
+        values = session.effective_prices.current(config.get("tax", 0) == 1)
+        self.label_map_count.config(text=f"🎫 {session.map_count}")
+        # Copy the drop list: the log thread keeps updating it while this runs on the Tk thread
+        tmp = session.copy_drops(show_all)
         if show_all:
-            tmp = drop_list_all
-            self.label_current_earn.config(text=f"🔥 {round(income_all, 2)}")
+            self.label_current_earn.config(text=f"🔥 {round(session.income_all, 2)}")
         else:
-            tmp = drop_list
-            self.label_current_earn.config(text=f"🔥 {round(income, 2)}")
+            self.label_current_earn.config(text=f"🔥 {round(session.income, 2)}")
         # Build a filtered list of displayable items with their total value
         items_to_display = []
         now = time.time()
         for key in tmp.keys():
             item_id = str(key)
-            if item_id not in full_table:
+            item_name = names.get(item_id)
+            if item_name is None:
                 continue
-            item_name = full_table[item_id].get("name", f"Unknown (ID: {item_id})")
-            item_type = full_table[item_id].get("type", "")
+            item_type = types.get(item_id, "")
             if item_type not in self.show_type:
                 continue
-            item_price = full_table[item_id].get("price", 0)
-            if config_data.get("tax", 0) == 1 and item_id != "100300":
-                item_price = item_price * 0.875
+            item_price = values.get(int(item_id), 0)
             qty = tmp.get(key, 0)
             total_value = qty * item_price
-            last_time = full_table[item_id].get("last_update", 0)
+            last_time = last_update.get(item_id, 0)
             time_passed = now - last_time
             if time_passed < 180:
                 status = self.status[0]
@@ -1192,32 +948,22 @@ class App(Tk):
         # Sort by total value descending (highest value first)
         items_to_display.sort(key=lambda x: x[3], reverse=True)
 
-        # Populate drops panel (Text widget) in sorted order with wrapping
-        self._list_item_ids = []
+        # Update the drops panel in sorted order; only changed or moved lines are rewritten
+        rows = []
+        for item_id, item_name, qty, total_value, status in items_to_display:
+            text = f"{status} {item_name} x{qty} [{round(total_value, 2)}]"
+            rows.append((item_id, text, GAIN_TAG if qty > 0 else LOSS_TAG))
         try:
-            self.inner_pannel_drop_listbox.config(state='normal')
-            self.inner_pannel_drop_listbox.delete("1.0", END)
-            for item_id, item_name, qty, total_value, status in items_to_display:
-                text = f"{status} {item_name} x{qty} [{round(total_value, 2)}]"
-                before = self.inner_pannel_drop_listbox.index("end-1c")
-                self._list_item_ids.append(item_id)
-                self.inner_pannel_drop_listbox.insert(END, text + "\n")
-                after = self.inner_pannel_drop_listbox.index("end-1c")
-                try:
-                    fg = "#006400" if qty > 0 else "#b20000"
-                    tag = f"item_{item_id}"
-                    self.inner_pannel_drop_listbox.tag_add(tag, before, after)
-                    self.inner_pannel_drop_listbox.tag_config(tag, foreground=fg)
-                except Exception:
-                    pass
-            self.inner_pannel_drop_listbox.config(state='disabled')
+            self.drop_panel.render(rows)
+            self._list_item_ids = self.drop_panel.order
         except Exception:
             pass
+        perf.record("reshow", t, len(rows))
 
     def update_single_drop(self, item_id):
         """Update a single displayed drop line for item_id if present."""
         try:
-            # Simpler: refresh the full list so ordering stays correct
+            # reshow() only rewrites the lines that changed, so ordering stays correct cheaply
             self.reshow()
         except Exception:
             pass
@@ -1227,8 +973,7 @@ class App(Tk):
         try:
             apply_local_overrides()
             # reload full_table.json into memory for UI
-            with open(resource_path("full_table.json"), 'r', encoding="utf-8") as f:
-                _ = json.load(f)
+            item_catalog.reload()
             self.reshow()
             # update small status indicator
             try:
@@ -1260,66 +1005,165 @@ class App(Tk):
         self.show_type = ["Special Item","Memory Material","Gameplay Ticket","Map Ticket","Cube Material","Corruption Material","Dream Material","Tower Material","BOSS Ticket","Divine Emblem","Overlap Material"]
         self.reshow()
 
+def update_rolling_rates():
+    """Show the shown session's rolling income rates in the configured unit"""
+    rates = shown_session().rates.per_minute(time.time())
+    if config.get("rate_unit", 1) == 1:
+        factor, suffix = 60, "/hr"
+    else:
+        factor, suffix = 1, "/min"
+    text = "   ".join(f"{label}: {round(rate * factor, 2)}" for label, rate in rates)
+    root.label_rolling_rates.config(text=f"🔥 {text} {suffix}" if text else "")
+
+def update_time_labels():
+    """Refresh the map/total timers and income rates shown in the main window"""
+    now = time.time()
+    session = shown_session()
+    map_time = session.current_map_time(now)
+    m = int(map_time // 60)
+    s = int(map_time % 60)
+    root.label_current_time.config(text=f"Current: {m}m{s}s")
+
+    # Calculate current speed (can be negative)
+    current_time_minutes = max(map_time / 60, 0.01)
+    current_speed = session.income / current_time_minutes
+    # Respect configured rate unit: 0 = per-minute, 1 = per-hour
+    try:
+        unit = config.get("rate_unit", 1)
+    except Exception:
+        unit = 1
+    if unit == 1:
+        display_current = current_speed * 60
+        suffix = "/hr"
+    else:
+        display_current = current_speed
+        suffix = "/min"
+    root.label_current_speed.config(text=f"🔥 {round(display_current, 2)} {suffix}")
+
+    tmp_total_time = session.total_play_time(now)
+    m = int(tmp_total_time // 60)
+    s = int(tmp_total_time % 60)
+    root.label_total_time.config(text=f"Total: {m}m{s}s")
+
+    # Calculate total speed (can be negative)
+    total_time_minutes = max(tmp_total_time / 60, 0.01)
+    total_speed = session.income_all / total_time_minutes
+    if unit == 1:
+        display_total = total_speed * 60
+        suffix = "/hr"
+    else:
+        display_total = total_speed
+        suffix = "/min"
+    root.label_total_speed.config(text=f"🔥 {round(display_total, 2)} {suffix}")
+
+def client_snapshot(client, now):
+    """Metrics for one client (runs on the log thread)"""
+    session = client.session
+    tailer = client.tailer
+    map_time = session.current_map_time(now)
+    total_time = session.total_play_time(now)
+    return MetricsSnapshot(
+        log=client.log_path,
+        # Same rates as the main window's labels, always per hour
+        income_rate_map=session.income / max(map_time / 60, 0.01) * 60 if session.is_in_map else 0,
+        income_rate_total=session.income_all / max(total_time / 60, 0.01) * 60,
+        income_map=session.income,
+        income_total=session.income_all,
+        map_count=session.map_count,
+        in_map=int(session.is_in_map),
+        map_seconds=map_time if session.is_in_map else 0,
+        map_seconds_total=total_time,
+        session_seconds=session.session_time(now),
+        lines_parsed=client.lines_parsed,
+        lines_per_second=client.line_rate.update(client.lines_parsed, now),
+        bytes_read=tailer.bytes_read,
+        bytes_behind=client.lag.bytes_behind,
+        parse_lag=client.lag.current(now),
+        falling_behind=int(client.lag.behind),
+        last_event_age=now - tailer.last_data_time if tailer.last_data_time else 0,
+    )
+
+def check_lag(now):
+    """Warn when a client's parse lag or unread backlog passes its limit (runs on the log thread)"""
+    recovered = False
+    for client in clients:
+        if not client.tailer.is_open:
+            continue
+        change = client.lag.check(now, client.tailer.bytes_behind())
+        if change == "behind":
+            print(f"[{client.name}] Tracker is falling behind the log: {client.lag.describe(now)}")
+        elif change == "recovered":
+            print(f"[{client.name}] Tracker caught up with the log (max lag {client.lag.max_lag:.1f} s)")
+            recovered = True
+    behind = [client for client in clients if client.lag.behind]
+    if behind:
+        client = behind[0]
+        set_startup_status(f"{client.name}: {client.lag.describe(now)} the log", "#b26b00")
+    elif recovered:
+        set_startup_status(tracking_status(), "green")
+
+def handle_log_text(client, things):
+    """Parse and apply new text from one client's log (runs on a parse worker)"""
+    perf.add("read", client.tailer.last_read_seconds, len(things))
+    # Tokenize the new text once and hand the records to each handler
+    t = perf.clock()
+    chunk = parse_log_chunk(things, client.price_parser)
+    perf.record("parse", t, chunk.line_count)
+    client.lines_parsed += chunk.line_count
+    t = perf.clock()
+    deal_change(client, chunk)
+    perf.record("deal_change", t, chunk.line_count)
+    if chunk.prices:
+        t = perf.clock()
+        get_price_info(chunk.prices)
+        perf.record("price info", t, len(chunk.prices))
+    # Wall clock minus the newest timestamp just applied
+    client.lag.observe(chunk.last_timestamp, time.time())
+    if client.session.is_in_map and client in shown_clients():
+        # New lines refresh the rates right away (coalesced with the once-a-second tick)
+        ui_updates.request("time_labels", update_time_labels)
+
 class MyThread(threading.Thread):
-    history = ""
+    poller = None
     def run(self):
-        global all_time_passed, income, drop_list, t, root
-        try:
-            self.history = open(position_log, "r", encoding="utf-8")
-            self.history.seek(0, 2)
-        except:
-            print(f"Could not open log file at {position_log}")
-            self.history = None
+        global root
+        # One thread follows every client's log; their chunks are parsed on a small worker pool
+        self.poller = ClientPoller(handle_log_text, workers=config.get("parse_workers", 2))
+        for client in clients:
+            if not client.tailer.open():
+                print(f"Could not open log file at {client.log_path}")
+            else:
+                # Rebuild the bag from the log up to where tailing starts, so drops are right without Initialize
+                restore_bag_from_log(client, client.tailer.position)
+            self.poller.add(client)
+        last_label_update = 0
+        last_lag_check = 0
+        last_metrics_update = 0
             
         while app_running:
             try:
-                time.sleep(1)
+                # Sleeps until the next tailer is due; polls slower while a log is idle
+                time.sleep(self.poller.poll_once())
                 if not app_running:
                     break
-                    
-                if self.history:
-                    things = self.history.read()
-                    # Process log changes
-                    deal_change(things)
-                    get_price_info(things)
-                if is_in_map:
-                    m = int((time.time() - t) // 60)
-                    s = int((time.time() - t) % 60)
-                    root.label_current_time.config(text=f"Current: {m}m{s}s")
-                    
-                    # Calculate current speed (can be negative)
-                    current_time_minutes = max((time.time() - t) / 60, 0.01)
-                    current_speed = income / current_time_minutes
-                    # Respect configured rate unit: 0 = per-minute, 1 = per-hour
-                    try:
-                        unit = config_data.get("rate_unit", 1)
-                    except Exception:
-                        unit = 1
-                    if unit == 1:
-                        display_current = current_speed * 60
-                        suffix = "/hr"
-                    else:
-                        display_current = current_speed
-                        suffix = "/min"
-                    root.label_current_speed.config(text=f"🔥 {round(display_current, 2)} {suffix}")
-                    
-                    tmp_total_time = total_time + (time.time() - t)
-                    m = int(tmp_total_time // 60)
-                    s = int(tmp_total_time % 60)
-                    root.label_total_time.config(text=f"Total: {m}m{s}s")
-                    
-                    # Calculate total speed (can be negative)
-                    total_time_minutes = max(tmp_total_time / 60, 0.01)
-                    total_speed = income_all / total_time_minutes
-                    if unit == 1:
-                        display_total = total_speed * 60
-                        suffix = "/hr"
-                    else:
-                        display_total = total_speed
-                        suffix = "/min"
-                    root.label_total_speed.config(text=f"🔥 {round(display_total, 2)} {suffix}")
-                else:
-                    t = time.time()
+
+                now = time.time()
+                for client in clients:
+                    # Keep the map clock at zero in the refuge; a busy client may be entering a map
+                    if not client.session.is_in_map and not self.poller.busy(client):
+                        client.session.tick(now)
+                if now - last_label_update >= 1:
+                    # Timers tick once per second; rolling rates keep moving in the refuge too
+                    last_label_update = now
+                    if shown_session().is_in_map:
+                        ui_updates.request("time_labels", update_time_labels)
+                    ui_updates.request("rolling_rates", update_rolling_rates)
+                if now - last_lag_check >= 1:
+                    last_lag_check = now
+                    check_lag(now)
+                if metrics_server and now - last_metrics_update >= 1:
+                    last_metrics_update = now
+                    metrics_server.publish(tuple(client_snapshot(client, now) for client in clients))
             except Exception as e:
                 print("-------------Exception-----------")
                 # Output error line number
@@ -1327,22 +1171,46 @@ class MyThread(threading.Thread):
                 traceback.print_exc()
         
         # Clean up
-        if self.history:
-            self.history.close()
+        self.poller.shutdown()
+        for client in clients:
+            client.tailer.close()
 
 # remote price updates removed — app runs fully standalone
 
-# Initialize data files before starting the application
-initialize_data_files()
-
-# Create the main application
+# Create the main application; data files, game discovery and the log thread follow on a
+# background thread so the window appears right away
+startup_timer.mark("imports and config")
 root = App()
 root.wm_attributes('-topmost', 1)
+startup_timer.mark("window")
+
+# Background threads queue UI work here; it runs on the Tk thread once per frame
+ui_updates = UiUpdatePump(root).start()
+config.add_listener(root.on_tax_changed, "tax")
 
-# Start the log reading thread
-MyThread().start()
+# Optional periodic dump of the stage timings (JSON lines), e.g. "perf_dump_file": "perf.jsonl"
+if config.get("perf_dump_file"):
+    perf.enabled = True
+    perf.start_dump(config.get("perf_dump_file"), config.get("perf_dump_interval", 60))
+
+# drop.txt is written in batches by a background thread ("immediate" restores per-drop writes)
+drop_journal = DropJournal("drop.txt", durability=config.get("journal_durability", "batched")).start()
+
+# Optional Prometheus/JSON endpoint on localhost, e.g. "metrics_port": 9185
+metrics_server = None
+if config.get("metrics_port"):
+    metrics_server = MetricsServer(int(config.get("metrics_port")), config.get("metrics_host", "127.0.0.1")).start()
+
+# Opened by run_startup_tasks()
+session_store = None
+log_thread = None
+
+threading.Thread(target=run_startup_tasks, name="Startup", daemon=True).start()
 
 # Remote price updater removed in standalone build
 
 # Start the main loop
 root.mainloop()
+
+# Flush drops, history rows and settings still queued, whether the loop ended from Exit or otherwise
+shutdown()
@@ -0,0 +1,81 @@
+"""
+How far the tracker is behind the game log it follows.
+
+Two numbers are kept per log:
+
+    lag           wall clock minus the newest UE timestamp parsed, measured as
+                  each chunk is applied (LogChunk.last_timestamp)
+    bytes behind  bytes written to the log that have not been read yet
+
+UE writes its timestamps in UTC or local time depending on the build, so the
+offset to time.time() is learned from the first chunk (tailing starts at EOF,
+so that chunk is fresh) and rounded to a whole quarter hour, the granularity
+of time zones.
+
+While the log is idle the newest timestamp stops moving but nothing is
+waiting, so the lag stays at its last measurement. Only while unread bytes
+pile up does it keep growing between chunks.
+"""
+
+# Unread bytes below this are a line the game is still writing, not a backlog
+CAUGHT_UP_BYTES = 64 * 1024
+# Time zones are whole quarter hours
+_OFFSET_STEP = 900
+
+
+class LagMonitor:
+    """Parse lag and unread backlog of one log, with a falling-behind flag"""
+
+    def __init__(self, warn_lag=5.0, warn_bytes=4 * 1024 * 1024):
+        self.warn_lag = warn_lag
+        self.warn_bytes = warn_bytes
+        self.offset = None       # seconds added to UE timestamps to get time.time()
+        self.newest = None       # newest parsed timestamp, on the wall clock
+        self.lag = 0.0           # measured when the last chunk was applied
+        self.max_lag = 0.0
+        self.bytes_behind = 0
+        self.behind = False
+        self.warnings = 0        # times the tracker started falling behind
+
+    def observe(self, timestamp, now):
+        """Record the newest timestamp of a chunk that was just applied"""
+        if timestamp is None:
+            return
+        if self.offset is None:
+            self.offset = round((now - timestamp) / _OFFSET_STEP) * _OFFSET_STEP
+        self.newest = timestamp + self.offset
+        self.lag = max(0.0, now - self.newest)
+        if self.lag > self.max_lag:
+            self.max_lag = self.lag
+
+    def current(self, now, bytes_behind=None):
+        """Lag as of now; grows between chunks only while a backlog is waiting"""
+        if bytes_behind is not None:
+            self.bytes_behind = bytes_behind
+        if self.newest is not None and self.bytes_behind > CAUGHT_UP_BYTES:
+            return max(self.lag, now - self.newest)
+        return self.lag
+
+    def check(self, now, bytes_behind):
+        """Update the backlog; returns "behind" or "recovered" when the state flips, else None"""
+        lag = self.current(now, bytes_behind)
+        behind = lag > self.warn_lag or bytes_behind > self.warn_bytes
+        if behind == self.behind:
+            return None
+        self.behind = behind
+        if behind:
+            self.warnings += 1
+            return "behind"
+        return "recovered"
+
+    def describe(self, now):
+        return f"{self.current(now):.1f} s / {self.bytes_behind / 1048576:.1f} MB behind"
+
+    def stats(self, now):
+        return {
+            "lag": round(self.current(now), 3),
+            "max_lag": round(self.max_lag, 3),
+            "bytes_behind": self.bytes_behind,
+            "behind": self.behind,
+            "warnings": self.warnings,
+        }
@@ -0,0 +1,226 @@
+"""
+Single-pass tokenizer for UE_game.log chunks.
+
+Every chunk read from the log is walked exactly once. Each line is classified
+with plain substring checks (BagMgr@:Modfy, BagMgr@:InitBagData, PageApplyBase@,
+XchgSearchPrice) and turned into records collected on a LogChunk, which the
+bag / map / price handlers in index.py consume instead of running their own
+regex passes over the whole text.
+
+Exchange price checks span several lines (a send block carrying the item id in
+"+refer [id]" and a receive block listing "+N [price]" samples), so they are
+handled by PriceCheckParser, a small state machine fed from the same walk that
+pairs the two halves by SynId.
+
+Each line starts with a UE timestamp ("[2025.10.22-14.00.00:036]"). Only the
+newest one in a chunk is decoded (LogChunk.last_timestamp), for lag tracking.
+"""
+
+import calendar
+import functools
+import re
+from collections import namedtuple
+
+# Refuge (hideout) scene; entering/leaving it marks map boundaries
+HIDEOUT_SCENE = ("World'/Game/Art/Maps/01SD/XZ_YuJinZhiXiBiNanSuo200/"
+                 "XZ_YuJinZhiXiBiNanSuo200.XZ_YuJinZhiXiBiNanSuo200'")
+
+_GAME_PREFIX = "GameLog: Display: [Game] "
+_BAG_MARKER = "BagMgr@:"
+_BAG_MODIFY = "BagMgr@:Modfy BagItem "
+_BAG_INIT = "BagMgr@:InitBagData "
+_SCENE_MARKER = "PageApplyBase@"
+_ENTER_MARKER = ("PageApplyBase@ _UpdateGameEnd: LastSceneName = " + HIDEOUT_SCENE +
+                 " NextSceneName = World'/Game/Art/Maps")
+_EXIT_MARKER = "NextSceneName = " + HIDEOUT_SCENE
+_PRICE_MARKER = "XchgSearchPrice"
+_PRICE_HEADER = "XchgSearchPrice----SynId = "
+_SOCKET_MARKER = "----Socket "
+_RECV_MARKER = "RecvMessage"
+_REFER_MARKER = "+refer ["
+_LOGIN_MARKERS = ("PlayerInitPkgMgr", "Login2Client")
+
+# Only ever applied with .match() at a known offset, so it cannot backtrack across the chunk
+_BAG_FIELDS = re.compile(r'PageId = (\d+) SlotId = (\d+) ConfigBaseId = (\d+) Num = (\d+)')
+_DIGITS = re.compile(r'\d+')
+# "+number [x.x]" price sample inside a receive block
+_PRICE_VALUE = re.compile(r'\+\d+\s+\[([\d.]+)\]')
+
+# One bag slot update. item_id stays a string because it keys full_table.json.
+BagRecord = namedtuple("BagRecord", "page_id slot_id item_id num")
+# One answered price check: the item id and the raw sample strings, in log order
+PriceRecord = namedtuple("PriceRecord", "item_id values")
+
+
+class LogChunk:
+    """Typed records extracted from one chunk of log text"""
+
+    __slots__ = ("text", "line_count", "bag_init", "bag_modify",
+                 "entering_map", "exiting_map", "login_seen", "prices", "last_timestamp")
+
+    def __init__(self, text):
+        self.text = text
+        self.line_count = 0
+        self.bag_init = []       # BagRecord from BagMgr@:InitBagData (full inventory snapshot)
+        self.bag_modify = []     # BagRecord from BagMgr@:Modfy BagItem
+        self.entering_map = False
+        self.exiting_map = False
+        self.login_seen = False
+        self.prices = []         # PriceRecord for each price check answered in this chunk
+        self.last_timestamp = None   # parse_timestamp() of the newest timestamped line
+
+
+def parse_timestamp(line):
+    """Seconds since the epoch of a line's "[YYYY.MM.DD-HH.MM.SS:mmm]" prefix, read as UTC; None if absent"""
+    if len(line) < 25 or line[0] != "[" or line[24] != "]":
+        return None
+    try:
+        return (_day_start(line[1:11]) + int(line[12:14]) * 3600 + int(line[15:17]) * 60
+                + int(line[18:20]) + int(line[21:24]) / 1000)
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _day_start(date):
+    """Epoch seconds of midnight UTC for "YYYY.MM.DD"; a live log only spans a day or two"""
+    return calendar.timegm((int(date[0:4]), int(date[5:7]), int(date[8:10]), 0, 0, 0))
+
+
+def _bag_record(line, idx, marker):
+    """Parse the PageId/SlotId/ConfigBaseId/Num fields following marker at idx"""
+    if not line.endswith(_GAME_PREFIX, 0, idx):
+        return None
+    m = _BAG_FIELDS.match(line, idx + len(marker))
+    if not m:
+        return None
+    page_id, slot_id, item_id, num = m.groups()
+    return BagRecord(int(page_id), int(slot_id), item_id, int(num))
+
+
+class PriceCheckParser:
+    """State machine pairing XchgSearchPrice send and receive blocks by SynId.
+
+    Send blocks map their SynId to the item id found on the "+refer [id]" line;
+    receive blocks collect up to MAX_SAMPLES "+N [price]" values until the next
+    socket message starts. Unanswered sends, and a receive block whose
+    terminator has not been read yet, carry over to the next chunk.
+    """
+
+    MAX_SAMPLES = 30
+    MAX_PENDING = 256
+
+    def __init__(self):
+        self.pending = {}          # SynId -> item id from the send block ("" until +refer is seen)
+        self._send_synid = None    # send block still waiting for its +refer line
+        self._recv_synid = None    # receive block currently collecting samples
+        self._values = []
+        self.active = False        # True while inside a block, so continuation lines are fed
+
+    def feed(self, line, out):
+        """Consume one log line, appending finished PriceRecords to out"""
+        header = line.find(_PRICE_HEADER)
+        if header >= 0 or _SOCKET_MARKER in line:
+            # Any new socket message ends the block we were in
+            self._close(out)
+            if header >= 0:
+                m = _DIGITS.match(line, header + len(_PRICE_HEADER))
+                if m:
+                    synid = m.group()
+                    if _RECV_MARKER in line:
+                        self._recv_synid = synid
+                    else:
+                        self._start_send(synid)
+                        self._find_refer(line, m.end())
+            self.active = self._send_synid is not None or self._recv_synid is not None
+            return
+
+        if self._send_synid is not None:
+            self._find_refer(line, 0)
+        elif self._recv_synid is not None and len(self._values) < self.MAX_SAMPLES:
+            self._values.extend(_PRICE_VALUE.findall(line))
+        self.active = self._send_synid is not None or self._recv_synid is not None
+
+    def finish(self, out):
+        """Close a receive block left open at the end of the text; only for a parse no chunk will follow"""
+        self._close(out)
+        self.active = self._send_synid is not None
+
+    def _start_send(self, synid):
+        if len(self.pending) >= self.MAX_PENDING:
+            # Drop the oldest unanswered request
+            del self.pending[next(iter(self.pending))]
+        self.pending[synid] = ""
+        self._send_synid = synid
+
+    def _find_refer(self, line, start):
+        idx = line.find(_REFER_MARKER, start)
+        if idx < 0:
+            return
+        m = _DIGITS.match(line, idx + len(_REFER_MARKER))
+        if m:
+            self.pending[self._send_synid] = m.group()
+            self._send_synid = None
+
+    def _close(self, out):
+        self._send_synid = None
+        if self._recv_synid is None:
+            return
+        item_id = self.pending.pop(self._recv_synid, "")
+        if item_id:
+            out.append(PriceRecord(item_id, self._values[:self.MAX_SAMPLES]))
+        self._recv_synid = None
+        self._values = []
+
+
+def parse_log_chunk(text, price_parser=None):
+    """Walk text once and return a LogChunk with every record the tracker cares about.
+
+    Pass a long-lived PriceCheckParser to pair price-check blocks across chunks;
+    a block still open at the end of the text is then finished by a later chunk.
+    """
+    chunk = LogChunk(text)
+    if not text:
+        return chunk
+    one_shot = price_parser is None
+    if one_shot:
+        price_parser = PriceCheckParser()
+    prices = chunk.prices
+
+    lines = text.split("\n")
+    chunk.line_count = len(lines) - (1 if lines[-1] == "" else 0)
+    for line in lines:
+        if price_parser.active or _PRICE_MARKER in line:
+            price_parser.feed(line, prices)
+
+        idx = line.find(_BAG_MARKER)
+        if idx >= 0:
+            if line.startswith(_BAG_MODIFY, idx):
+                record = _bag_record(line, idx, _BAG_MODIFY)
+                if record:
+                    chunk.bag_modify.append(record)
+            elif line.startswith(_BAG_INIT, idx):
+                record = _bag_record(line, idx, _BAG_INIT)
+                if record:
+                    chunk.bag_init.append(record)
+            continue
+
+        if _SCENE_MARKER in line or "NextSceneName" in line:
+            if _ENTER_MARKER in line:
+                chunk.entering_map = True
+            if _EXIT_MARKER in line:
+                chunk.exiting_map = True
+            continue
+
+        if not chunk.login_seen and (_LOGIN_MARKERS[0] in line or _LOGIN_MARKERS[1] in line):
+            chunk.login_seen = True
+
+    if one_shot:
+        price_parser.finish(prices)
+    # Newest timestamp: the last line usually has one; price-block continuation lines do not
+    for line in reversed(lines):
+        timestamp = parse_timestamp(line)
+        if timestamp is not None:
+            chunk.last_timestamp = timestamp
+            break
+    return chunk
@@ -0,0 +1,104 @@
+"""
+Memory-mapped, bytes-level scan of a whole UE_game.log.
+
+Offline passes over a full log (replay, analysis) only care about the lines
+carrying a handful of markers, which are a small fraction of the file. Rather
+than decoding every line to str, scan_lines() mmaps the log, jumps from marker
+to marker with bytes.find() (one position per marker, kept in a heap) and
+decodes only the matching lines. Memory use is the mapped pages the OS chooses
+to keep, not a copy of the log.
+
+Price checks span several lines: from the XchgSearchPrice header down to the
+next "----Socket " line the whole block is returned, so PriceCheckParser sees
+the "+refer" and "+N [price]" lines between them.
+"""
+
+import heapq
+import mmap
+
+MARKERS = (
+    b"BagMgr@:",
+    b"PageApplyBase@",
+    b"NextSceneName",
+    b"XchgSearchPrice",
+    b"PlayerInitPkgMgr",
+    b"Login2Client",
+)
+_PRICE_HEADER = b"XchgSearchPrice----SynId"
+_SOCKET_MARKER = b"----Socket "
+# A price block longer than this is not a real one; stop at the header line
+MAX_BLOCK_BYTES = 1024 * 1024
+
+
+def iter_segments(buf, markers=MARKERS, start=0, end=None):
+    """Yield (offset, bytes) for each line of buf containing a marker (whole blocks for price checks).
+
+    `start` must be the start of a line. Segments include their trailing newline.
+    """
+    if end is None:
+        end = len(buf)
+    heap = []
+    for i, marker in enumerate(markers):
+        idx = buf.find(marker, start, end)
+        if idx >= 0:
+            heap.append((idx, i))
+    heapq.heapify(heap)
+
+    pos = start              # everything before pos has been returned or skipped
+    while heap:
+        idx, i = heap[0]
+        if idx < pos:
+            # This marker sits in a line that was already returned; look again after it
+            idx = buf.find(markers[i], pos, end)
+            if idx < 0:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (idx, i))
+            continue
+
+        newline = buf.rfind(b"\n", pos, idx)
+        line_start = newline + 1 if newline >= 0 else pos
+        newline = buf.find(b"\n", idx, end)
+        line_end = newline + 1 if newline >= 0 else end
+
+        if buf.find(_PRICE_HEADER, line_start, line_end) >= 0:
+            # Extend to the end of the line that closes the block
+            close = buf.find(_SOCKET_MARKER, line_end, min(end, line_end + MAX_BLOCK_BYTES))
+            if close >= 0:
+                close_start = buf.rfind(b"\n", line_end, close) + 1 or line_end
+                newline = buf.find(b"\n", close, end)
+                close_end = newline + 1 if newline >= 0 else end
+                if buf.find(_PRICE_HEADER, close_start, close_end) >= 0:
+                    # The closing line opens the next block (a RecvMessage right after its
+                    # SendMessage); stop before it so it is scanned as a block of its own
+                    line_end = close_start
+                else:
+                    line_end = close_end
+
+        yield line_start, buf[line_start:line_end]
+        pos = line_end
+
+
+def scan_lines(path, markers=MARKERS):
+    """Yield the decoded marker lines of a log file, newline-terminated, in file order"""
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file: nothing to map
+            return
+        try:
+            for _, segment in iter_segments(mm, markers):
+                text = segment.decode("utf-8", errors="replace")
+                if "\r" in text:
+                    text = text.replace("\r\n", "\n")
+                if not text.endswith("\n"):
+                    text += "\n"
+                # Price blocks come back as several lines; hand them over one line at a time
+                if text.count("\n") > 1:
+                    for line in text[:-1].split("\n"):
+                        yield line + "\n"
+                else:
+                    yield text
+        finally:
+            mm.close()
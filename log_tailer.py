@@ -0,0 +1,152 @@
+"""
+Adaptive tail reader for UE_game.log.
+
+Instead of sleeping a fixed second between reads, the tailer polls the file
+size on a short interval while the game is writing and backs off exponentially
+(up to max_interval) while the log is idle, so new lines are delivered almost
+as soon as they land and an idle tracker wakes rarely. The game runs on
+Windows, where inotify does not exist, so plain size polling is used everywhere.
+
+Only complete lines are returned: a trailing partial line is held back and
+prefixed to the next read, so a BagMgr or XchgSearchPrice line split across two
+reads is still seen whole. If the log shrinks (the game restarted and truncated
+it) or the path now points at a different file, the tailer reopens it and
+continues from the start of the new log.
+"""
+
+import codecs
+import io
+import os
+import time
+
+
+class LogTailer:
+    """Follow a growing log file and return newly appended text"""
+
+    def __init__(self, path, min_interval=0.05, max_interval=1.0, backoff=2.0):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.wakeups = 0       # number of polls (sleep + size check)
+        self.reads = 0         # polls that returned new data
+        self.bytes_read = 0
+        self.reopens = 0       # truncations / replacements of the log that were followed
+        self.last_data_time = 0.0
+        self.last_read_seconds = 0.0   # time spent in the last read that returned data
+        self._file = None
+        self._pos = 0
+        self._decoder = None
+        self._partial = ""     # text after the last newline, waiting for the rest of its line
+
+    @property
+    def is_open(self):
+        return self._file is not None
+
+    @property
+    def position(self):
+        """Byte offset of the next read; lines before it have been consumed (or skipped at open)"""
+        return self._pos - len(self._partial.encode("utf-8"))
+
+    def open(self, seek_end=True):
+        """Open the log, by default positioned at its end. Returns False if it cannot be opened."""
+        self.close()
+        try:
+            self._file = open(self.path, "rb")
+        except OSError:
+            return False
+        self._pos = self._file.seek(0, 2) if seek_end else 0
+        # Decodes UTF-8 split across reads and turns \r\n into \n like text mode did
+        self._decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True)
+        self._partial = ""
+        return True
+
+    def close(self):
+        if self._file:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+
+    def size(self):
+        """Current size of the log on disk, or -1 if it cannot be read"""
+        try:
+            return os.fstat(self._file.fileno()).st_size if self._file else os.stat(self.path).st_size
+        except OSError:
+            return -1
+
+    def _check_replaced(self):
+        """Reopen from the start if the log was truncated or replaced; returns the on-disk size"""
+        try:
+            st = os.stat(self.path)
+            fst = os.fstat(self._file.fileno())
+        except OSError:
+            # The log can briefly disappear while the game recreates it; keep the old handle
+            return -1
+        replaced = st.st_ino and fst.st_ino and (st.st_ino != fst.st_ino or st.st_dev != fst.st_dev)
+        if replaced or st.st_size < self._pos:
+            print(f"Log file {'replaced' if replaced else 'truncated'}, reopening {self.path}")
+            self.reopens += 1
+            if not self.open(seek_end=False):
+                return -1
+        return st.st_size
+
+    def read(self):
+        """Return complete lines appended since the last read without waiting ("" if none)"""
+        if not self._file:
+            return ""
+        started = time.perf_counter()
+        if self._check_replaced() <= self._pos:
+            return ""
+        data = self._file.read()
+        if not data:
+            return ""
+        self._pos += len(data)
+        self.bytes_read += len(data)
+        self.reads += 1
+        self.last_data_time = time.time()
+        text = self._partial + self._decoder.decode(data)
+        end = text.rfind("\n") + 1
+        self._partial = text[end:]
+        self.last_read_seconds = time.perf_counter() - started
+        return text[:end]
+
+    def poll(self, wait=True):
+        """Sleep for the current interval, then read; speeds up while data flows and backs off when idle.
+
+        With wait=False the caller has already waited (clients.ClientPoller schedules several tailers).
+        """
+        if wait:
+            time.sleep(self.interval)
+        self.wakeups += 1
+        reads = self.reads
+        text = self.read()
+        # A read that only extended a partial line still means the game is writing
+        if self.reads != reads:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return text
+
+    def bytes_behind(self):
+        """Bytes written to the log that have not been returned yet (0 if closed)"""
+        if self._file is None:
+            return 0
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+        except OSError:
+            return 0
+        return max(0, size - self.position)
+
+    def stats(self):
+        return {
+            "wakeups": self.wakeups,
+            "reads": self.reads,
+            "bytes_read": self.bytes_read,
+            "reopens": self.reopens,
+            "partial_line_chars": len(self._partial),
+            "interval": self.interval,
+        }
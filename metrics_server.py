@@ -0,0 +1,157 @@
+"""
+Optional localhost HTTP endpoint with the tracker's live numbers.
+
+The log thread builds a MetricsSnapshot per tracked game log about once a
+second and hands the tuple to MetricsServer.publish(), which only swaps a
+reference. Request handlers read whatever snapshots are current, so a scrape
+never takes a lock the parse path holds and never reads session state while
+it is being updated.
+
+    GET /metrics        Prometheus text format, one series per log (label log="...")
+    GET /metrics.json   the same snapshots as a JSON list (also /json)
+
+The server binds to 127.0.0.1 by default and is off unless config.json sets
+metrics_port.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MetricsSnapshot:
+    """One immutable reading of the tracker, built on the log thread"""
+
+    # field: (Prometheus metric, type, help, labels)
+    FIELDS = {
+        "income_rate_map": ("tli_income_rate_per_hour", "gauge", "Income per hour", {"scope": "map"}),
+        "income_rate_total": ("tli_income_rate_per_hour", "gauge", "Income per hour", {"scope": "session"}),
+        "income_map": ("tli_income", "gauge", "Income", {"scope": "map"}),
+        "income_total": ("tli_income", "gauge", "Income", {"scope": "session"}),
+        "map_count": ("tli_maps_total", "counter", "Maps entered this session", {}),
+        "in_map": ("tli_in_map", "gauge", "1 while inside a map", {}),
+        "map_seconds": ("tli_map_seconds", "gauge", "Time spent in maps", {"scope": "map"}),
+        "map_seconds_total": ("tli_map_seconds", "gauge", "Time spent in maps", {"scope": "session"}),
+        "session_seconds": ("tli_session_seconds", "gauge", "Wall-clock time since the session started", {}),
+        "lines_parsed": ("tli_lines_parsed_total", "counter", "Log lines parsed", {}),
+        "lines_per_second": ("tli_lines_parsed_per_second", "gauge", "Log lines parsed per second", {}),
+        "bytes_read": ("tli_log_bytes_read_total", "counter", "Bytes read from the game log", {}),
+        "bytes_behind": ("tli_log_bytes_behind", "gauge", "Bytes between the read position and EOF", {}),
+        "parse_lag": ("tli_parse_lag_seconds", "gauge", "Wall clock minus the newest parsed log timestamp", {}),
+        "falling_behind": ("tli_falling_behind", "gauge", "1 while parse lag or backlog is over its limit", {}),
+        "last_event_age": ("tli_last_event_age_seconds", "gauge", "Seconds since new log lines last arrived", {}),
+    }
+
+    __slots__ = ("time", "log") + tuple(FIELDS)
+
+    def __init__(self, log="", **values):
+        object.__setattr__(self, "time", time.time())
+        object.__setattr__(self, "log", log)
+        for name in self.FIELDS:
+            object.__setattr__(self, name, values.get(name, 0))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MetricsSnapshot is immutable")
+
+    def as_dict(self):
+        data = {"time": self.time, "log": self.log}
+        data.update((name, getattr(self, name)) for name in self.FIELDS)
+        return data
+
+
+def format_prometheus(snapshots):
+    """Prometheus text exposition of several snapshots; each metric is described once"""
+    series = {}              # metric -> [sample lines], in FIELDS order
+    for snapshot in snapshots:
+        log_label = snapshot.log.replace("\\", "\\\\").replace('"', '\\"')
+        for name, (metric, kind, help_text, labels) in MetricsSnapshot.FIELDS.items():
+            label_text = ",".join([f'log="{log_label}"'] + [f'{k}="{v}"' for k, v in labels.items()])
+            series.setdefault(metric, []).append(f"{metric}{{{label_text}}} {float(getattr(snapshot, name)):g}")
+    lines = []
+    described = {}
+    for metric, kind, help_text, labels in MetricsSnapshot.FIELDS.values():
+        described.setdefault(metric, (kind, help_text))
+    for metric, samples in series.items():
+        kind, help_text = described[metric]
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+class RateCounter:
+    """Turns a growing total into a per-second rate, sampled by the caller once in a while"""
+
+    def __init__(self):
+        self._last_total = 0
+        self._last_time = None
+        self.rate = 0.0
+
+    def update(self, total, now):
+        if self._last_time is not None and now > self._last_time:
+            self.rate = max(0, total - self._last_total) / (now - self._last_time)
+        self._last_total = total
+        self._last_time = now
+        return self.rate
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        snapshots = self.server.metrics.snapshots
+        path = self.path.split("?", 1)[0]
+        if path in ("/metrics.json", "/json"):
+            body = json.dumps([s.as_dict() for s in snapshots]).encode("utf-8")
+            content_type = "application/json"
+        elif path in ("/metrics", "/"):
+            body = format_prometheus(snapshots).encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the console
+        pass
+
+
+class MetricsServer:
+    """Serves the latest published MetricsSnapshots over HTTP on a daemon thread"""
+
+    def __init__(self, port, host="127.0.0.1"):
+        self.host = host
+        self.port = port
+        self.snapshots = ()
+        self._httpd = None
+        self._thread = None
+
+    def publish(self, snapshots):
+        """Replace the served snapshots with a tuple of MetricsSnapshot, one per tracked log"""
+        # A single reference swap; handlers keep using the tuple they already read
+        self.snapshots = tuple(snapshots)
+
+    def start(self):
+        """Bind and start serving. Returns self, or None if the port cannot be bound."""
+        try:
+            self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        except OSError as e:
+            print(f"Metrics endpoint disabled: cannot listen on {self.host}:{self.port}: {e}")
+            return None
+        self._httpd.daemon_threads = True
+        self._httpd.metrics = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="Metrics", daemon=True)
+        self._thread.start()
+        print(f"Metrics endpoint: http://{self.host}:{self.port}/metrics")
+        return self
+
+    def close(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
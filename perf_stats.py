@@ -0,0 +1,130 @@
+"""
+Lightweight timing of the tracker's hot-path stages.
+
+Each stage keeps a call count, total time, and the last `ring_size` durations
+and sizes (bytes, lines or items, whatever the stage handles) in fixed-size
+ring buffers, from which p50/p99 are computed on demand. Instrumented code
+does:
+
+    t = perf.clock()
+    ...work...
+    perf.record("parse", t, size)
+
+While the recorder is disabled clock() returns 0 and record() returns at once,
+so the instrumentation can stay in place.
+"""
+
+import json
+import threading
+import time
+from array import array
+
+
+class StageStats:
+    """Counters and ring buffers for one stage"""
+
+    __slots__ = ("count", "total", "max", "durations", "sizes", "next")
+
+    def __init__(self, ring_size):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.durations = array("d", [0.0] * ring_size)
+        self.sizes = array("d", [0.0] * ring_size)
+        self.next = 0
+
+    def add(self, seconds, size):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        i = self.next
+        self.durations[i] = seconds
+        self.sizes[i] = size
+        self.next = (i + 1) % len(self.durations)
+
+    def summary(self):
+        n = min(self.count, len(self.durations))
+        recent = sorted(self.durations[:n]) if n else [0.0]
+        sizes = self.sizes[:n]
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": recent[len(recent) // 2] * 1000,
+            "p99_ms": recent[min(len(recent) - 1, int(len(recent) * 0.99))] * 1000,
+            "max_ms": self.max * 1000,
+            "mean_size": sum(sizes) / n if n else 0.0,
+        }
+
+
+class PerfRecorder:
+    """Per-stage timings shared by the log thread and the UI thread"""
+
+    def __init__(self, enabled=False, ring_size=1024):
+        self.enabled = enabled
+        self.ring_size = ring_size
+        self.started = time.time()
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._dump_thread = None
+        self._dump_stop = threading.Event()
+
+    def clock(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    def record(self, name, start, size=0):
+        """Record the time since `start` (from clock()) for a stage"""
+        if not self.enabled or not start:
+            return
+        self.add(name, time.perf_counter() - start, size)
+
+    def add(self, name, seconds, size=0):
+        """Record a duration measured elsewhere"""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = StageStats(self.ring_size)
+            stats.add(seconds, size)
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self.started = time.time()
+
+    def snapshot(self):
+        """{stage: summary dict}, in the order stages were first seen"""
+        with self._lock:
+            return {name: stats.summary() for name, stats in self._stages.items()}
+
+    def format_table(self):
+        lines = [f"{'stage':<14}{'count':>8}{'mean ms':>10}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'size':>10}"]
+        for name, s in self.snapshot().items():
+            lines.append(f"{name:<14}{s['count']:>8}{s['mean_ms']:>10.3f}{s['p50_ms']:>9.3f}"
+                         f"{s['p99_ms']:>9.3f}{s['max_ms']:>9.2f}{s['mean_size']:>10.0f}")
+        if len(lines) == 1:
+            lines.append("(no samples yet)")
+        return "\n".join(lines)
+
+    def start_dump(self, path, interval=60.0):
+        """Append a JSON snapshot to `path` every `interval` seconds on a daemon thread"""
+        if self._dump_thread is not None:
+            return
+        self._dump_stop.clear()
+        self._dump_thread = threading.Thread(target=self._dump_loop, args=(path, interval),
+                                             name="PerfDump", daemon=True)
+        self._dump_thread.start()
+
+    def stop_dump(self):
+        self._dump_stop.set()
+        self._dump_thread = None
+
+    def _dump_loop(self, path, interval):
+        while not self._dump_stop.wait(interval):
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"time": time.time(), "stages": self.snapshot()}) + "\n")
+            except OSError as e:
+                print(f"Failed to write performance stats to {path}: {e}")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""replay.py
+
+Run the tracker's parsing pipeline headless over a saved UE_game.log.
+- no Tk window, no win32 calls: works on any OS
+- feeds the log through the same parse_log_chunk() / TrackerSession code as the app
+- prints session totals, map count, per-map income and time, and throughput
+- map times and rates follow the log's own timestamps, not the replay's clock
+- by default the log is mmapped and only lines with tracker markers are decoded
+  (log_scanner); --no-mmap reads and parses every line like the live app
+
+full_table.json is only read unless --write-prices is given.
+
+Usage: python replay.py path/to/UE_game.log [--tax] [--write-prices] [--verbose]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+from catalog import ItemCatalog
+from log_parser import parse_log_chunk, PriceCheckParser
+from log_scanner import scan_lines
+from session_store import SessionStore
+from tracker import TrackerSession, collect_price_updates
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def iter_chunks(f, chunk_bytes):
+    """Yield the log in chunks of whole lines, the way the live tailer would deliver them.
+
+    The app applies map changes and InitBagData snapshots per chunk, so a chunk is
+    also cut before every scene change and right after an InitBagData burst; that
+    keeps each chunk to at most one map transition and one bag snapshot.
+    """
+    buf = []
+    size = 0
+    in_init = False
+    for line in f:
+        if buf and ("PageApplyBase@" in line or (in_init and "BagMgr@:InitBagData" not in line)):
+            yield "".join(buf)
+            buf = []
+            size = 0
+        in_init = "BagMgr@:InitBagData" in line
+        buf.append(line)
+        size += len(line)
+        if size >= chunk_bytes and not in_init:
+            yield "".join(buf)
+            buf = []
+            size = 0
+    if buf:
+        yield "".join(buf)
+
+
+def replay(path, catalog, tax=False, chunk_bytes=256 * 1024, write_prices=False, initialize=True, store=None,
+           use_mmap=True):
+    """Feed a saved log through the pipeline as fast as possible and return a stats dict.
+
+    With a SessionStore, the replay is recorded as a new session in the history database.
+    """
+    catalog.refresh()
+    session = TrackerSession(catalog)
+    session.tax = tax
+    if store:
+        store.begin_session(os.path.abspath(path), tax)
+    if initialize:
+        # Use the first InitBagData burst in the log, like clicking Initialize before playing
+        session.start_initialization()
+    price_parser = PriceCheckParser()
+
+    lines = 0
+    chunks = 0
+    drops = 0
+    price_checks = 0
+    prices = {}
+    now = None
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if use_mmap:
+            source = scan_lines(path)
+            stack.callback(source.close)
+        else:
+            source = stack.enter_context(open(path, "r", encoding="utf-8", errors="replace"))
+        for text in iter_chunks(source, chunk_bytes):
+            chunk = parse_log_chunk(text, price_parser)
+            lines += chunk.line_count
+            chunks += 1
+            timestamp = chunk.last_timestamp
+            if timestamp is not None:
+                if now is None:
+                    session.start_clock(timestamp)
+                else:
+                    # The map clock starts where the previous chunk ended, like the app's 1 s tick
+                    session.tick(now)
+                now = timestamp
+            result = session.process_chunk(chunk, now)
+            drops += len(result.drops)
+            if store:
+                store.record_chunk(session, result, now)
+            if chunk.prices:
+                price_checks += len(chunk.prices)
+                updates = collect_price_updates(chunk.prices)
+                prices.update(updates)
+                if store:
+                    store.record_prices(chunk.prices, updates, "replay", now=now)
+    if store:
+        store.end_session()
+        store.flush()
+    elapsed = time.perf_counter() - start
+
+    if write_prices and prices:
+        catalog.update_prices(prices, "FurryHeiLi")
+
+    size = os.path.getsize(path)
+    return {
+        "session": session,
+        "end_time": now,
+        "lines": lines,
+        "mmap": use_mmap,
+        "bytes": size,
+        "chunks": chunks,
+        "drops": drops,
+        "price_checks": price_checks,
+        "prices": prices,
+        "elapsed": elapsed,
+        "lines_per_sec": lines / elapsed if elapsed > 0 else 0.0,
+        "mb_per_sec": size / 1048576 / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def print_report(path, stats, top=10):
+    session = stats["session"]
+    kind = "matching lines" if stats.get("mmap") else "lines"
+    print(f"Replayed {path}: {stats['lines']:,} {kind}, {stats['bytes'] / 1048576:.1f} MB "
+          f"in {stats['elapsed']:.2f} s ({stats['lines_per_sec']:,.0f} lines/s, {stats['mb_per_sec']:.1f} MB/s)")
+    print(f"Bag initialized: {session.bag_initialized}")
+    print(f"Maps: {session.map_count}")
+    print(f"Total income: {round(session.income_all, 2)}")
+    print(f"Drop events: {stats['drops']}")
+    print(f"Price checks: {stats['price_checks']} ({len(stats['prices'])} items priced)")
+
+    if session.map_runs:
+        print("\nPer-map income:")
+        for run in session.map_runs:
+            if run.exited is not None:
+                print(f"  #{run.index}: {round(run.income, 2)} in {run.exited - run.entered:.0f} s")
+            else:
+                print(f"  #{run.index}: {round(run.income, 2)}")
+        average = session.income_all / len(session.map_runs)
+        print(f"  average: {round(average, 2)}")
+        if stats.get("end_time") is not None:
+            rates = session.rates.per_minute(stats["end_time"])
+            print("Rolling income per minute at the end of the log: "
+                  + ", ".join(f"{label} {round(rate, 2)}" for label, rate in rates))
+
+    totals = []
+    for item_id, qty in session.drop_list_all.items():
+        value = qty * session.item_price(item_id) if item_id in session.catalog.prices else 0
+        totals.append((value, item_id, qty))
+    if totals:
+        totals.sort(reverse=True)
+        print(f"\nTop {min(top, len(totals))} items by value:")
+        for value, item_id, qty in totals[:top]:
+            print(f"  {session.catalog.name(item_id, item_id)} x{qty} [{round(value, 2)}]")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a saved UE_game.log through the tracker without the UI")
+    parser.add_argument("log", help="path to a saved UE_game.log")
+    parser.add_argument("--catalog", default=os.path.join(ROOT, "full_table.json"),
+                        help="item table to price drops with (default: full_table.json next to this script)")
+    parser.add_argument("--tax", action="store_true", help="apply the exchange tax to item values")
+    parser.add_argument("--chunk-kb", type=int, default=256, help="size of each chunk fed to the parser")
+    parser.add_argument("--no-init", action="store_true",
+                        help="do not wait for an InitBagData burst; use the legacy first-scan baseline")
+    parser.add_argument("--write-prices", action="store_true",
+                        help="write prices from price checks in the log back to the catalog")
+    parser.add_argument("--no-mmap", action="store_true",
+                        help="decode and parse every line instead of scanning the mmapped log for markers")
+    parser.add_argument("--db", help="also record the replay into this SQLite history database")
+    parser.add_argument("--verbose", action="store_true", help="show the per-event output of the tracker")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.log):
+        print(f"Log file not found: {args.log}")
+        return 1
+
+    if not os.path.exists(args.catalog):
+        print(f"Catalog not found: {args.catalog}")
+        return 1
+    catalog = ItemCatalog(args.catalog)
+    try:
+        catalog.refresh()
+    except (OSError, ValueError) as e:
+        print(f"Cannot read catalog {args.catalog}: {e}")
+        return 1
+    # The tracker prints every map change and unknown item; keep replays quiet by default
+    with contextlib.ExitStack() as stack:
+        store = None
+        if args.db:
+            store = SessionStore(args.db).start()
+            stack.callback(store.close)
+        if not args.verbose:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        stats = replay(args.log, catalog, tax=args.tax, chunk_bytes=args.chunk_kb * 1024,
+                       write_prices=args.write_prices, initialize=not args.no_init, store=store,
+                       use_mmap=not args.no_mmap)
+        if store:
+            maps, average = store.recent_map_income(500)
+            stats["db_maps"], stats["db_average"] = maps, average
+    print_report(args.log, stats)
+    if "db_maps" in stats:
+        print(f"\nHistory ({args.db}): average income over the last {stats['db_maps']} maps: "
+              f"{round(stats['db_average'], 2)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
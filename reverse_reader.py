@@ -0,0 +1,66 @@
+"""
+Read a log file backwards from EOF in fixed-size blocks.
+
+Only the tail of the file that is actually needed gets read and decoded, so
+showing "the last N lines" of a multi-hundred-megabyte UE_game.log costs the
+same as on a fresh one. Lines are split on b"\\n" before decoding; that byte
+never occurs inside a UTF-8 multi-byte sequence, so no character is cut.
+"""
+
+import os
+
+BLOCK_SIZE = 64 * 1024
+
+
+def iter_lines_reversed(f, end=None, block_size=BLOCK_SIZE):
+    """Yield (offset, line_bytes) from `end` (default EOF) back to the start of a binary file.
+
+    line_bytes excludes the newline (and a trailing \\r); offset is where the line starts.
+    A last line without a trailing newline is yielded as well.
+    """
+    if end is None:
+        end = f.seek(0, os.SEEK_END)
+    pos = end
+    carry = b""              # start of the line that continues into the block read before
+    first = True             # the first block read is the one at EOF
+    while pos > 0:
+        size = min(block_size, pos)
+        pos -= size
+        f.seek(pos)
+        data = f.read(size) + carry
+        lines = data.split(b"\n")
+        carry = lines[0]
+        offset = pos + len(data)
+        if first:
+            first = False
+            if lines[-1] == b"" and len(lines) > 1:
+                # The file ends with a newline: there is no line after it
+                lines.pop()
+                offset -= 1
+        for i in range(len(lines) - 1, 0, -1):
+            line = lines[i]
+            offset -= len(line) + 1
+            yield offset + 1, line.rstrip(b"\r")
+    if end > 0:
+        yield 0, carry.rstrip(b"\r")
+
+
+def tail_lines(path, count=50, match=None, max_bytes=None, block_size=BLOCK_SIZE):
+    """Return up to `count` of the last lines of a file, oldest first, as decoded text.
+
+    match:     optional predicate on the decoded line; only matching lines are counted
+    max_bytes: stop after scanning this many bytes back from EOF even if fewer lines matched
+    """
+    found = []
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        for offset, raw in iter_lines_reversed(f, end, block_size):
+            if max_bytes is not None and end - offset > max_bytes:
+                break
+            line = raw.decode("utf-8", errors="replace")
+            if match is None or match(line):
+                found.append(line)
+                if len(found) >= count:
+                    break
+    found.reverse()
+    return found
@@ -0,0 +1,139 @@
+"""
+Income rates over rolling windows, updated in O(1) per event.
+
+The main window's rates are income divided by time for the current map and
+for the whole session. Deciding whether a farming strategy still pays needs
+recent numbers too: income over the last 5 / 15 / 60 minutes of wall-clock
+time (refuge time included, so it is real throughput) and over the last N
+finished maps (map time only; a map counts once the next one starts, like
+its row in the history database).
+
+WindowSum keeps a ring of fixed-width time buckets and a running total; the
+buckets that fall out of the window are subtracted as the clock moves, so
+adding income or reading the total never looks at the session's history.
+RecentMaps does the same for the last N maps with one slot per map. Both
+recompute their totals from the ring once per revolution so float drift
+cannot build up over an all-day session.
+
+Reading a window also moves it forward, so IncomeRates serializes the parse
+workers' updates and the Tk thread's reads with a lock.
+"""
+
+import threading
+import time
+from array import array
+
+DEFAULT_WINDOWS = (300, 900, 3600)
+DEFAULT_LAST_MAPS = 10
+
+
+def window_label(seconds):
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+class WindowSum:
+    """Sum of the amounts added during the last `window` seconds, in `buckets` time buckets"""
+
+    def __init__(self, window, buckets=60):
+        self.window = window
+        self.width = window / buckets
+        self.buckets = array("d", [0.0] * buckets)
+        self.total = 0.0
+        self.head = None         # absolute number of the newest bucket (time // width)
+
+    def _advance(self, now):
+        n = int(now // self.width)
+        head = self.head
+        if head is None:
+            self.head = n
+            return
+        if n <= head:
+            return
+        size = len(self.buckets)
+        if n - head >= size:
+            # Nothing added so far is still inside the window
+            self.buckets = array("d", [0.0] * size)
+            self.total = 0.0
+        else:
+            buckets = self.buckets
+            for k in range(head + 1, n + 1):
+                i = k % size
+                self.total -= buckets[i]
+                buckets[i] = 0.0
+                if i == 0:
+                    self.total = sum(buckets)
+        self.head = n
+
+    def add(self, amount, now):
+        self._advance(now)
+        self.buckets[self.head % len(self.buckets)] += amount
+        self.total += amount
+
+    def sum(self, now):
+        self._advance(now)
+        return self.total
+
+
+class RecentMaps:
+    """Income and map time of the last `size` finished maps"""
+
+    def __init__(self, size):
+        self.size = size
+        self.incomes = array("d", [0.0] * size)
+        self.durations = array("d", [0.0] * size)
+        self.count = 0
+        self.income_sum = 0.0
+        self.duration_sum = 0.0
+        self._next = 0
+
+    def add(self, income, duration):
+        i = self._next
+        self.income_sum += income - self.incomes[i]
+        self.duration_sum += duration - self.durations[i]
+        self.incomes[i] = income
+        self.durations[i] = duration
+        self._next = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        if self._next == 0:
+            self.income_sum = sum(self.incomes)
+            self.duration_sum = sum(self.durations)
+
+
+class IncomeRates:
+    """Rolling income rates of one TrackerSession; safe to update and read from different threads"""
+
+    def __init__(self, windows=DEFAULT_WINDOWS, last_maps=DEFAULT_LAST_MAPS, now=None):
+        self.started = time.time() if now is None else now
+        self.windows = [WindowSum(w) for w in windows]
+        self.maps = RecentMaps(last_maps) if last_maps else None
+        self.lock = threading.Lock()
+
+    def add_income(self, amount, now):
+        with self.lock:
+            for window in self.windows:
+                window.add(amount, now)
+
+    def add_map(self, income, duration):
+        if self.maps:
+            with self.lock:
+                self.maps.add(income, duration)
+
+    def per_minute(self, now=None):
+        """[(label, income per minute)] for each time window, then the last N maps"""
+        now = time.time() if now is None else now
+        elapsed = now - self.started
+        rates = []
+        with self.lock:
+            for window in self.windows:
+                # Early in a session the window is only partly filled; divide by the time it covers
+                minutes = max(min(window.window, elapsed) / 60, 0.01)
+                rates.append((window_label(window.window), window.sum(now) / minutes))
+            if self.maps:
+                minutes = max(self.maps.duration_sum / 60, 0.01)
+                rate = self.maps.income_sum / minutes if self.maps.count else 0.0
+                rates.append((f"{self.maps.size} maps", rate))
+        return rates
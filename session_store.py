@@ -0,0 +1,220 @@
+"""
+SQLite history of sessions, map runs, drops and price samples.
+
+drop.txt stays the human-readable journal; this store is what history
+queries run against. The log thread only queues rows: a batch_writer thread
+inserts them in one transaction per batch (max_rows rows or max_delay
+seconds), and the database runs in WAL mode so queries from the UI thread
+do not block behind those writes.
+
+Tables (times are time.time() seconds, item ids are stored as integers):
+- sessions:      one row per tracking session (app start or Reset Tracking)
+- map_runs:      one row per map, keyed by (session_id, map_index)
+- drops:         every DropEvent; negative amounts are consumption
+- price_samples: every averaged exchange price check
+"""
+
+import itertools
+import sqlite3
+import time
+
+from batch_writer import BatchWriter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL,
+    log_path TEXT,
+    tax INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS map_runs (
+    session_id INTEGER NOT NULL,
+    map_index INTEGER NOT NULL,
+    entered REAL NOT NULL,
+    exited REAL,
+    income REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, map_index)
+);
+CREATE TABLE IF NOT EXISTS drops (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL,
+    map_index INTEGER,
+    time REAL NOT NULL,
+    item_id INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    price REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS price_samples (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    item_id INTEGER NOT NULL,
+    price REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_map_runs_entered ON map_runs (entered);
+CREATE INDEX IF NOT EXISTS idx_drops_item_time ON drops (item_id, time);
+CREATE INDEX IF NOT EXISTS idx_drops_time ON drops (time);
+CREATE INDEX IF NOT EXISTS idx_price_samples_item_time ON price_samples (item_id, time);
+"""
+
+_UPSERT_MAP_RUN = ("INSERT OR REPLACE INTO map_runs (session_id, map_index, entered, exited, income) "
+                   "VALUES (?, ?, ?, ?, ?)")
+_INSERT_DROP = ("INSERT INTO drops (session_id, map_index, time, item_id, amount, price) "
+                "VALUES (?, ?, ?, ?, ?, ?)")
+_INSERT_PRICE = "INSERT INTO price_samples (time, item_id, price, samples, source) VALUES (?, ?, ?, ?, ?)"
+
+
+class SessionStore:
+    """Batched, thread-safe writer and query helper for the tracker's history database"""
+
+    def __init__(self, path, max_rows=500, max_delay=1.0):
+        self.path = path
+        self.session_id = None
+        self.rows_written = 0
+        self.batches_written = 0
+        # Queues (sql, params) rows in arrival order; its io_lock serializes use of the connection
+        self._writer = BatchWriter(self._write, "SessionStore", max_rows, max_delay)
+        self._db_lock = self._writer.io_lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL only risks the last batch on power loss, never corruption
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def start(self):
+        self._writer.start()
+        return self
+
+    # --- recording ----------------------------------------------------------
+
+    # Every recording method takes an optional session_id; without one the rows go to the
+    # store's current session. Several game clients tracked at once each keep their own id.
+
+    def begin_session(self, log_path=None, tax=False, now=None, current=True):
+        """Start a new session row and return its id.
+
+        With current=True the store's current session is closed and replaced by the new one;
+        with current=False the caller keeps the id and passes it to the record methods.
+        """
+        now = time.time() if now is None else now
+        if current:
+            self.end_session(now)
+        with self._db_lock:
+            if self._writer.finished:
+                return None
+            cur = self._conn.execute("INSERT INTO sessions (started, log_path, tax) VALUES (?, ?, ?)",
+                                     (now, log_path, int(tax)))
+            self._conn.commit()
+        if current:
+            self.session_id = cur.lastrowid
+        return cur.lastrowid
+
+    def end_session(self, now=None, session_id=None):
+        if session_id is None:
+            session_id = self.session_id
+            self.session_id = None
+        if session_id is None:
+            return
+        self._put([("UPDATE sessions SET ended = ? WHERE id = ?",
+                    (time.time() if now is None else now, session_id))])
+
+    def record_map_run(self, run, session_id=None):
+        """Insert or update a tracker.MapRun of the session"""
+        session_id = self.session_id if session_id is None else session_id
+        if session_id is None:
+            return
+        self._put([(_UPSERT_MAP_RUN, (session_id, run.index, run.entered, run.exited, run.income))])
+
+    def record_drops(self, drop_events, map_index=None, now=None, session_id=None):
+        session_id = self.session_id if session_id is None else session_id
+        if session_id is None or not drop_events:
+            return
+        now = time.time() if now is None else now
+        self._put([(_INSERT_DROP, (session_id, map_index, now, int(e.item_id), e.amount, e.price))
+                   for e in drop_events])
+
+    def record_chunk(self, session, result, now=None, session_id=None):
+        """Record what a TrackerSession.process_chunk() call changed"""
+        now = time.time() if now is None else now
+        runs = session.map_runs
+        if result.entering_map and len(runs) > 1:
+            # The previous map keeps earning until this one starts; store its final income
+            self.record_map_run(runs[-2], session_id)
+        if result.drops:
+            self.record_drops(result.drops, runs[-1].index if runs else None, now, session_id)
+        if runs and (result.entering_map or result.exiting_map or result.drops):
+            self.record_map_run(runs[-1], session_id)
+
+    def record_prices(self, price_records, updates, source=None, limit=30, now=None):
+        """Store the averaged prices from collect_price_updates() with their sample counts"""
+        if not updates:
+            return
+        now = time.time() if now is None else now
+        samples = {item_id: min(len(values), limit) for item_id, values in price_records}
+        self._put([(_INSERT_PRICE, (now, int(item_id), price, samples.get(item_id, 0), source))
+                   for item_id, price in updates.items()])
+
+    # --- queries --------------------------------------------------------------
+
+    def query(self, sql, params=()):
+        """Run a read query after writing everything queued so far"""
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def recent_map_income(self, limit=500):
+        """(map count, average income) over the last `limit` finished maps"""
+        row = self.query("SELECT COUNT(*), AVG(income) FROM "
+                         "(SELECT income FROM map_runs WHERE exited IS NOT NULL "
+                         "ORDER BY entered DESC LIMIT ?)", (limit,))[0]
+        return row[0], row[1] or 0.0
+
+    def item_totals(self, since=None, limit=None):
+        """[(item_id, total amount, total value)] since a time, most valuable first"""
+        sql = "SELECT item_id, SUM(amount), SUM(amount * price) AS value FROM drops"
+        params = []
+        if since is not None:
+            sql += " WHERE time >= ?"
+            params.append(since)
+        sql += " GROUP BY item_id ORDER BY value DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [(str(item_id), amount, value) for item_id, amount, value in self.query(sql, params)]
+
+    def price_history(self, item_id, since=None, limit=100):
+        """[(time, price, samples)] for one item, newest first"""
+        return self.query("SELECT time, price, samples FROM price_samples "
+                          "WHERE item_id = ? AND time >= ? ORDER BY time DESC LIMIT ?",
+                          (int(item_id), since or 0, limit))
+
+    # --- writer ----------------------------------------------------------------
+
+    def flush(self):
+        """Write every queued row now, in the caller's thread"""
+        self._writer.flush()
+
+    def close(self):
+        """Write what is queued, close the session row, stop the writer thread and close the database.
+
+        Rows recorded after this are dropped.
+        """
+        self.end_session()
+        self._writer.close(self._conn.close)
+
+    def _put(self, rows):
+        self._writer.put(rows)
+
+    def _write(self, batch):
+        try:
+            with self._conn:
+                # One transaction per batch; consecutive rows of the same kind share an executemany
+                for sql, group in itertools.groupby(batch, key=lambda row: row[0]):
+                    self._conn.executemany(sql, [params for _, params in group])
+            self.rows_written += len(batch)
+            self.batches_written += 1
+        except sqlite3.Error as e:
+            print(f"Failed to write {len(batch)} rows to {self.path}: {e}")
@@ -0,0 +1,89 @@
+"""
+Startup helpers: phase timing and discovery of the running game's log.
+
+index.py shows its window first and runs the slow startup work (local
+overrides, catalog load, game discovery, history database) on a background
+thread. psutil and pywin32 are only imported inside find_game_logs(), so their
+import cost is paid on that thread instead of before the window appears.
+Every game window is checked, so several clients running side by side are
+each tracked from their own log.
+"""
+
+import os
+import time
+
+GAME_WINDOW_TITLE = "Torchlight: Infinite  "
+DEFAULT_LOG = "UE_game.log"
+
+
+class PhaseTimer:
+    """Records how long each startup phase took, measured from the previous mark"""
+
+    def __init__(self, label="startup", start=None):
+        self.label = label
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []         # (name, seconds)
+        self._last = self.start
+
+    def mark(self, name):
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self.phases.append((name, elapsed))
+        print(f"[{self.label}] {name}: {elapsed * 1000:.1f} ms")
+        return elapsed
+
+    def total(self):
+        return self._last - self.start
+
+    def report(self):
+        print(f"[{self.label}] done in {self.total() * 1000:.1f} ms: "
+              + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases))
+
+
+def find_game_logs(title=GAME_WINDOW_TITLE):
+    """Locate UE_game.log of every running game client. Returns (paths, None) or ([], reason).
+
+    Clients started from the same install share one log, so they come back as one path.
+    """
+    try:
+        import psutil
+        import win32gui
+        import win32process
+    except ImportError as e:
+        return [], f"game discovery unavailable: {e}"
+
+    windows = []
+
+    def collect(hwnd, _):
+        if win32gui.GetWindowText(hwnd) == title:
+            windows.append(hwnd)
+        return True
+
+    try:
+        win32gui.EnumWindows(collect, None)
+    except Exception as e:
+        return [], str(e)
+    if not windows:
+        return [], "game window not found"
+
+    paths = []
+    errors = []
+    for hwnd in windows:
+        try:
+            tid, pid = win32process.GetWindowThreadProcessId(hwnd)
+            position_game = psutil.Process(pid).exe()
+            position_log = position_game + "/../../../TorchLight/Saved/Logs/UE_game.log"
+            position_log = os.path.normpath(position_log).replace("\\", "/")
+            # Make sure the log can actually be opened before handing it to a tailer
+            with open(position_log, "rb"):
+                pass
+        except Exception as e:
+            errors.append(str(e))
+            continue
+        if position_log not in paths:
+            print(f"Log file location: {position_log}")
+            paths.append(position_log)
+    if not paths:
+        return [], "; ".join(errors)
+    return paths, None
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""synthetic_log.py
+
+Write a realistic synthetic UE_game.log for testing and benchmarking the parser.
+- InitBagData burst (bag sort) at the start
+- map runs: PageApplyBase scene change out of XZ_YuJinZhiXiBiNanSuo200, noise,
+  Modfy BagItem pickups, and the scene change back to the refuge
+- XchgSearchPrice send/receive blocks between maps (bulk price checks)
+
+Item ids are taken from full_table.json when it is present so drops can be priced.
+
+Usage: python synthetic_log.py out.log [--maps 50] [--noise 400] [--seed 1]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+from log_parser import HIDEOUT_SCENE
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GAME_PREFIX = "GameLog: Display: [Game] "
+MAP_SCENES = [
+    "World'/Game/Art/Maps/02KD/KD_YuanSuKuangDong000/KD_YuanSuKuangDong000.KD_YuanSuKuangDong000'",
+    "World'/Game/Art/Maps/03HX/HX_JiaoTangMuDi000/HX_JiaoTangMuDi000.HX_JiaoTangMuDi000'",
+    "World'/Game/Art/Maps/04JJ/JJ_JianTingZhiCheng000/JJ_JianTingZhiCheng000.JJ_JianTingZhiCheng000'",
+]
+NOISE = [
+    "ItemChange@ ProtoName=PickItems",
+    "SkillMgr@ CastSkill SkillId = 2100 Level = 20",
+    "MonsterMgr@ Spawn MonsterId = 40011 Count = 6",
+    "UIMgr@ OpenPanel Name = MiniMap",
+    "BuffMgr@ AddBuff BuffId = 8002 Stack = 3",
+    "NetMgr@ Ping = 43ms",
+]
+DEFAULT_ITEMS = ["100300", "1001", "1009", "1011", "5028", "5210", "10042"]
+
+
+def load_item_ids(path=os.path.join(ROOT, "full_table.json")):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            ids = list(json.load(f).keys())
+        return ids or DEFAULT_ITEMS
+    except Exception:
+        return DEFAULT_ITEMS
+
+
+class LogWriter:
+    """Formats lines with UE-style timestamps that advance as lines are written"""
+
+    def __init__(self, out, rng, start=None):
+        self.out = out
+        self.rng = rng
+        self.now = start or datetime(2025, 10, 22, 14, 0, 0)
+        self.frame = 0
+        self.lines = 0
+
+    def stamp(self):
+        self.now += timedelta(milliseconds=self.rng.randint(0, 40))
+        self.frame = (self.frame + 1) % 1000
+        return f"[{self.now:%Y.%m.%d-%H.%M.%S}:{self.now.microsecond // 1000:03d}][{self.frame:3d}]"
+
+    def game(self, text):
+        self.out.write(f"{self.stamp()}{GAME_PREFIX}{text}\n")
+        self.lines += 1
+
+    def raw(self, text):
+        self.out.write(text + "\n")
+        self.lines += 1
+
+    def idle(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+class SyntheticLog:
+    """Generates a session: bag sort, then map runs separated by price checks in town"""
+
+    def __init__(self, writer, rng, item_ids, bag_slots=120):
+        self.w = writer
+        self.rng = rng
+        self.item_ids = item_ids
+        self.bag = {}           # (page, slot) -> [item_id, num]
+        self.next_slot = 0
+        self.syn_id = 1000
+        self.bag_slots = bag_slots
+
+    def init_bag(self):
+        for _ in range(self.bag_slots):
+            self._new_slot(self.rng.choice(self.item_ids), self.rng.randint(1, 999))
+        for (page, slot), (item_id, num) in self.bag.items():
+            self.w.game(f"BagMgr@:InitBagData PageId = {page} SlotId = {slot} ConfigBaseId = {item_id} Num = {num}")
+
+    def _new_slot(self, item_id, num):
+        page = 100 + self.next_slot // 200
+        slot = self.next_slot % 200
+        self.next_slot += 1
+        self.bag[(page, slot)] = [item_id, num]
+        return page, slot
+
+    def pickup(self):
+        if self.bag and self.rng.random() < 0.7:
+            page, slot = self.rng.choice(list(self.bag))
+            entry = self.bag[(page, slot)]
+            entry[1] += self.rng.randint(1, 20)
+        else:
+            page, slot = self._new_slot(self.rng.choice(self.item_ids), self.rng.randint(1, 20))
+            entry = self.bag[(page, slot)]
+        self.w.game(f"BagMgr@:Modfy BagItem PageId = {page} SlotId = {slot} ConfigBaseId = {entry[0]} Num = {entry[1]}")
+
+    def noise(self, count):
+        for _ in range(count):
+            self.w.game(self.rng.choice(NOISE))
+
+    def map_run(self, noise, pickups):
+        scene = self.rng.choice(MAP_SCENES)
+        self.w.game(f"PageApplyBase@ _UpdateGameEnd: LastSceneName = {HIDEOUT_SCENE} NextSceneName = {scene}")
+        for _ in range(pickups):
+            self.noise(noise // max(pickups, 1))
+            self.pickup()
+        self.w.idle(self.rng.randint(60, 240))
+        self.w.game(f"PageApplyBase@ _UpdateGameEnd: LastSceneName = {scene} NextSceneName = {HIDEOUT_SCENE}")
+
+    def price_check(self, samples=30):
+        self.syn_id += 1
+        item_id = self.rng.choice(self.item_ids)
+        w = self.w
+        w.game(f"----Socket SendMessage STT----XchgSearchPrice----SynId = {self.syn_id}")
+        w.game("")
+        w.raw("+filters")
+        w.raw("|    +1")
+        w.raw(f"|    |  +refer [{item_id}]")
+        w.raw("----Socket SendMessage End----")
+        w.game(f"----Socket RecvMessage STT----XchgSearchPrice----SynId = {self.syn_id}")
+        w.game("")
+        w.raw("+errCode [0]")
+        w.raw("+prices")
+        base = self.rng.uniform(0.01, 500)
+        for i in range(1, samples + 1):
+            w.raw(f"|  +{i} [{round(base * (1 + i / 100), 4)}]")
+        w.raw("----Socket RecvMessage End----")
+        return item_id
+
+
+def generate(out, maps=50, noise=400, pickups=25, price_checks=5, seed=1, item_ids=None):
+    """Write a synthetic session to the open file `out`; returns the number of lines written"""
+    rng = random.Random(seed)
+    writer = LogWriter(out, rng)
+    log = SyntheticLog(writer, rng, item_ids or load_item_ids())
+    log.noise(50)
+    log.init_bag()
+    for _ in range(maps):
+        log.map_run(noise, pickups)
+        log.noise(noise // 10)
+        for _ in range(price_checks):
+            log.price_check()
+    return writer.lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic UE_game.log")
+    parser.add_argument("out", help="output log path")
+    parser.add_argument("--maps", type=int, default=50, help="number of map runs")
+    parser.add_argument("--noise", type=int, default=400, help="unrelated log lines per map")
+    parser.add_argument("--pickups", type=int, default=25, help="Modfy BagItem lines per map")
+    parser.add_argument("--price-checks", type=int, default=5, help="price-check blocks between maps")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with open(args.out, "w", encoding="utf-8", newline="\n") as f:
+        lines = generate(f, args.maps, args.noise, args.pickups, args.price_checks, args.seed)
+    print(f"Wrote {lines:,} lines ({os.path.getsize(args.out) / 1048576:.1f} MB) to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
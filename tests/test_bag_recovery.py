@@ -0,0 +1,57 @@
+from bag_recovery import reconstruct_bag
+
+GAME = "[2025.10.22-14.00.00:036][  1]GameLog: Display: [Game] "
+
+
+def init(slot, item_id, num):
+    return GAME + f"BagMgr@:InitBagData PageId = 102 SlotId = {slot} ConfigBaseId = {item_id} Num = {num}"
+
+
+def modify(slot, item_id, num):
+    return GAME + f"BagMgr@:Modfy BagItem PageId = 102 SlotId = {slot} ConfigBaseId = {item_id} Num = {num}"
+
+
+def noise(count):
+    return [GAME + f"NetMgr@ Ping = {i}ms" for i in range(count)]
+
+
+def write_log(tmp_path, rows):
+    path = tmp_path / "UE_game.log"
+    path.write_bytes(("\n".join(rows) + "\n").encode("utf-8"))
+    return path
+
+
+def test_newest_snapshot_plus_later_modifications(tmp_path):
+    rows = ([init(0, "100300", 1)] * 3 + noise(50)          # an older snapshot
+            + [init(slot, "5011", 2) for slot in range(4)]
+            + noise(50)
+            + [modify(0, "5011", 7), modify(9, "100300", 40)] + noise(10))
+    recovery = reconstruct_bag(str(write_log(tmp_path, rows)), min_entries=4)
+    assert recovery.snapshot_entries == 4
+    assert recovery.modifications == 2
+    assert recovery.bag.totals == {"5011": 13, "100300": 40}
+    # The snapshot is the baseline; later modifications are not
+    assert recovery.bag.baseline == {"5011": 8}
+
+
+def test_small_bursts_are_skipped(tmp_path):
+    rows = ([init(slot, "5011", 1) for slot in range(4)] + noise(5)
+            + [init(0, "100300", 9)] + noise(5))          # a single stray line is not a snapshot
+    recovery = reconstruct_bag(str(write_log(tmp_path, rows)), min_entries=4)
+    assert recovery.bag.totals == {"5011": 4}
+
+
+def test_stops_at_end_offset(tmp_path):
+    rows = [init(slot, "5011", 1) for slot in range(4)] + [modify(0, "5011", 5)]
+    path = write_log(tmp_path, rows)
+    # Recover as of the start of the Modfy line, where a tailer opened at that offset would begin
+    end = path.read_bytes().index(b"[2025", len(rows[0]) * 4)
+    recovery = reconstruct_bag(str(path), end=end, min_entries=4)
+    assert recovery.modifications == 0
+    assert recovery.bag.totals == {"5011": 4}
+
+
+def test_no_snapshot(tmp_path):
+    path = write_log(tmp_path, noise(20) + [modify(0, "5011", 5)])
+    assert reconstruct_bag(str(path), min_entries=4) is None
+    assert reconstruct_bag(str(path), max_bytes=10, min_entries=1) is None
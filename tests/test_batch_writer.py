@@ -0,0 +1,54 @@
+import sqlite3
+
+from batch_writer import BatchWriter
+from drop_journal import DropJournal
+from session_store import SessionStore
+from tracker import MapRun
+
+
+def test_batches_by_size_and_flush():
+    batches = []
+    writer = BatchWriter(batches.append, "Test", max_items=3, max_delay=60).start()
+    writer.put([1, 2])
+    writer.flush()
+    writer.put([3, 4, 5, 6])
+    writer.close()
+    assert [item for batch in batches for item in batch] == [1, 2, 3, 4, 5, 6]
+    assert batches[0] == [1, 2]
+
+
+def test_puts_after_close_are_dropped():
+    batches = []
+    released = []
+    writer = BatchWriter(batches.append, "Test", max_items=10, max_delay=60).start()
+    writer.put(["a"])
+    writer.close(lambda: released.append(True))
+    assert writer.put(["b", "c"]) is False
+    writer.flush()
+    assert batches == [["a"]]
+    assert released == [True]
+    assert writer.dropped == 2
+
+
+def test_journal_does_not_reopen_after_close(tmp_path):
+    path = tmp_path / "drop.txt"
+    journal = DropJournal(str(path), max_lines=2, max_delay=60).start()
+    journal.write_many(["1\n", "2\n", "3\n"])
+    journal.close()
+    journal.write("late\n")
+    journal.flush()
+    assert path.read_text() == "1\n2\n3\n"
+    assert journal._file is None
+
+
+def test_session_store_records_after_close_are_dropped(tmp_path):
+    path = tmp_path / "tracker.db"
+    store = SessionStore(str(path)).start()
+    session_id = store.begin_session("UE_game.log", current=False)
+    store.record_map_run(MapRun(1, 10.0), session_id)
+    store.close()
+    # A log thread still running at shutdown must not hit the closed connection
+    store.record_map_run(MapRun(2, 20.0), session_id)
+    assert store.begin_session("UE_game.log") is None
+    with sqlite3.connect(str(path)) as conn:
+        assert conn.execute("SELECT map_index FROM map_runs").fetchall() == [(1,)]
@@ -0,0 +1,83 @@
+import random
+
+from drop_panel import DropPanel, stable_positions
+
+
+class FakeText:
+    """The few Tk Text calls DropPanel makes, on a list of (text, tag) lines"""
+
+    def __init__(self):
+        self.lines = []
+
+    def config(self, **options):
+        pass
+
+    def tag_config(self, tag, **options):
+        pass
+
+    @staticmethod
+    def _line(index):
+        return int(index.split(".")[0]) - 1
+
+    def delete(self, start, end):
+        if (start, end) == ("1.0", "end"):
+            self.lines = []
+        elif end.endswith(".end"):
+            self.lines[self._line(start)] = ("", None)
+        else:
+            del self.lines[self._line(start):self._line(end)]
+
+    def insert(self, index, text, tag=None):
+        line = self._line(index)
+        if text.endswith("\n"):
+            self.lines.insert(line, (text[:-1], tag))
+        else:
+            self.lines[line] = (text, tag)
+
+
+def test_stable_positions_is_a_longest_increasing_run():
+    assert stable_positions([]) == set()
+    assert stable_positions([3, 0, 1, 2]) == {1, 2, 3}
+    rng = random.Random(1)
+    for _ in range(200):
+        sequence = rng.sample(range(20), rng.randint(1, 12))
+        keep = sorted(stable_positions(sequence))
+        values = [sequence[i] for i in keep]
+        assert values == sorted(values) and len(set(values)) == len(values)
+        # Brute-force length of the longest increasing subsequence
+        best = [1] * len(sequence)
+        for i in range(len(sequence)):
+            for j in range(i):
+                if sequence[j] < sequence[i]:
+                    best[i] = max(best[i], best[j] + 1)
+        assert len(keep) == max(best)
+
+
+def test_render_matches_rows_and_touches_only_changes():
+    widget = FakeText()
+    panel = DropPanel(widget)
+    rows = [(str(i), f"item {i}", "gain") for i in range(10)]
+    panel.render(rows)
+    assert widget.lines == [(text, tag) for _, text, tag in rows]
+
+    # One item climbs to the top and another changes its text: one move, one rewrite
+    writes = panel.line_writes
+    rows = [rows[7]] + rows[:7] + rows[8:]
+    rows[3] = ("2", "item 2 x2", "loss")
+    panel.render(rows)
+    assert widget.lines == [(text, tag) for _, text, tag in rows]
+    assert panel.line_writes - writes == 3
+
+
+def test_render_random_orders():
+    rng = random.Random(2)
+    widget = FakeText()
+    panel = DropPanel(widget)
+    for _ in range(100):
+        ids = rng.sample(range(30), rng.randint(0, 15))
+        rows = [(str(i), f"item {i} x{rng.randint(1, 3)}", rng.choice(["gain", "loss"])) for i in ids]
+        panel.render(rows)
+        assert widget.lines == [(text, tag) for _, text, tag in rows]
+    panel.clear()
+    panel.render([("1", "item 1", "gain")])
+    assert widget.lines == [("item 1", "gain")]
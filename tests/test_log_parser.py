@@ -0,0 +1,106 @@
+import calendar
+
+from log_parser import HIDEOUT_SCENE, BagRecord, PriceCheckParser, PriceRecord, parse_log_chunk, parse_timestamp
+
+GAME = "[2025.10.22-14.00.00:036][  1]GameLog: Display: [Game] "
+
+
+def lines(*rows):
+    return "\n".join(rows) + "\n"
+
+
+def send(synid, item_id):
+    return [GAME + f"----Socket SendMessage STT----XchgSearchPrice----SynId = {synid}",
+            f"|    |  +refer [{item_id}]",
+            "----Socket SendMessage End----"]
+
+
+def recv(synid, *prices):
+    return ([GAME + f"----Socket RecvMessage STT----XchgSearchPrice----SynId = {synid}"]
+            + [f"|  +{i} [{price}]" for i, price in enumerate(prices, 1)]
+            + ["----Socket RecvMessage End----"])
+
+
+def test_bag_records():
+    chunk = parse_log_chunk(lines(
+        GAME + "BagMgr@:InitBagData PageId = 102 SlotId = 0 ConfigBaseId = 100300 Num = 50",
+        GAME + "BagMgr@:Modfy BagItem PageId = 102 SlotId = 1 ConfigBaseId = 5011 Num = 3",
+        "BagMgr@:Modfy BagItem PageId = 102 SlotId = 2 ConfigBaseId = 5012 Num = 1",
+    ))
+    assert chunk.bag_init == [BagRecord(102, 0, "100300", 50)]
+    # Only lines written by the game logger count
+    assert chunk.bag_modify == [BagRecord(102, 1, "5011", 3)]
+    assert chunk.line_count == 3
+
+
+def test_scene_changes():
+    maps = "World'/Game/Art/Maps/02KD/KD_Map01/KD_Map01.KD_Map01'"
+    enter = parse_log_chunk(lines(
+        GAME + f"PageApplyBase@ _UpdateGameEnd: LastSceneName = {HIDEOUT_SCENE} NextSceneName = {maps}"))
+    leave = parse_log_chunk(lines(
+        GAME + f"PageApplyBase@ _UpdateGameEnd: LastSceneName = {maps} NextSceneName = {HIDEOUT_SCENE}"))
+    assert (enter.entering_map, enter.exiting_map) == (True, False)
+    assert (leave.entering_map, leave.exiting_map) == (False, True)
+
+
+def test_parse_timestamp():
+    expected = calendar.timegm((2025, 10, 22, 14, 0, 0)) + 0.036
+    assert parse_timestamp(GAME + "NetMgr@ Ping = 43ms") == expected
+    assert parse_timestamp("|  +1 [2.5]") is None
+    assert parse_timestamp("[2025.10.22-xx.00.00:036][  1]GameLog") is None
+
+
+def test_last_timestamp_skips_continuation_lines():
+    chunk = parse_log_chunk(lines(*send(1, 1001)))
+    assert chunk.last_timestamp == parse_timestamp(GAME)
+
+
+def test_price_check_pairs_send_and_receive():
+    chunk = parse_log_chunk(lines(*send(7, 1001), *recv(7, "2.5", "3.5")))
+    assert chunk.prices == [PriceRecord("1001", ["2.5", "3.5"])]
+
+
+def test_receive_right_after_send():
+    # No End line between the blocks: the receive header closes the send block
+    text = lines(*send(7, 1001)[:2], *recv(7, "2.5"))
+    assert parse_log_chunk(text).prices == [PriceRecord("1001", ["2.5"])]
+
+
+def test_unanswered_send_carries_over_chunks():
+    parser = PriceCheckParser()
+    assert parse_log_chunk(lines(*send(7, 1001)), parser).prices == []
+    assert parse_log_chunk(lines(*recv(7, "4.0")), parser).prices == [PriceRecord("1001", ["4.0"])]
+
+
+def test_receive_block_split_across_chunks():
+    parser = PriceCheckParser()
+    block = recv(7, "2.5", "3.5", "4.5")
+    first = parse_log_chunk(lines(*send(7, 1001), *block[:2]), parser)
+    second = parse_log_chunk(lines(*block[2:]), parser)
+    assert first.prices == []
+    assert second.prices == [PriceRecord("1001", ["2.5", "3.5", "4.5"])]
+
+
+def test_one_shot_parse_closes_open_block():
+    text = lines(*send(7, 1001), *recv(7, "2.5")[:2])
+    assert parse_log_chunk(text).prices == [PriceRecord("1001", ["2.5"])]
+
+
+def test_receive_without_send_is_ignored():
+    assert parse_log_chunk(lines(*recv(9, "1.0"))).prices == []
+
+
+def test_samples_are_capped():
+    prices = [str(i) for i in range(PriceCheckParser.MAX_SAMPLES + 10)]
+    (record,) = parse_log_chunk(lines(*send(7, 1001), *recv(7, *prices))).prices
+    assert len(record.values) == PriceCheckParser.MAX_SAMPLES
+
+
+def test_pending_sends_are_bounded():
+    parser = PriceCheckParser()
+    rows = []
+    for synid in range(PriceCheckParser.MAX_PENDING + 5):
+        rows += send(synid, 1000 + synid)
+    parse_log_chunk(lines(*rows), parser)
+    assert len(parser.pending) == PriceCheckParser.MAX_PENDING
+    assert "0" not in parser.pending
@@ -0,0 +1,55 @@
+from log_parser import PriceCheckParser, parse_log_chunk
+from log_scanner import scan_lines
+
+GAME = "[2025.10.22-14.00.00:036][  1]GameLog: Display: [Game] "
+
+
+def write_log(tmp_path, rows):
+    path = tmp_path / "UE_game.log"
+    path.write_bytes(("\n".join(rows) + "\n").encode("utf-8"))
+    return path
+
+
+def test_price_checks_match_full_parse(tmp_path):
+    rows = [
+        # A RecvMessage right after its SendMessage, with no End line in between
+        GAME + "----Socket SendMessage STT----XchgSearchPrice----SynId = 7",
+        "|    |  +refer [1001]",
+        GAME + "----Socket RecvMessage STT----XchgSearchPrice----SynId = 7",
+        "|  +1 [2.5]", "|  +2 [3.5]",
+        "----Socket RecvMessage End----",
+        GAME + "NetMgr@ Ping = 43ms",
+        # The usual shape, closed by End lines
+        GAME + "----Socket SendMessage STT----XchgSearchPrice----SynId = 8",
+        "|    |  +refer [1002]",
+        "----Socket SendMessage End----",
+        GAME + "----Socket RecvMessage STT----XchgSearchPrice----SynId = 8",
+        "|  +1 [4.0]",
+        "----Socket RecvMessage End----",
+        GAME + "NetMgr@ Ping = 43ms",
+    ]
+    path = write_log(tmp_path, rows)
+    scanned = parse_log_chunk("".join(scan_lines(str(path))), PriceCheckParser()).prices
+    expected = parse_log_chunk(path.read_text(encoding="utf-8")).prices
+    assert scanned == expected
+    assert [r.values for r in expected] == [["2.5", "3.5"], ["4.0"]]
+
+
+def test_only_marker_lines_are_decoded(tmp_path):
+    rows = [
+        GAME + "NetMgr@ Ping = 43ms",
+        GAME + "BagMgr@:Modfy BagItem PageId = 102 SlotId = 1 ConfigBaseId = 5011 Num = 3",
+        GAME + "SkillMgr@ CastSkill SkillId = 2100 Level = 20",
+        GAME + "PageApplyBase@ _UpdateGameEnd: LastSceneName = A NextSceneName = B",
+    ]
+    path = write_log(tmp_path, rows)
+    assert list(scan_lines(str(path))) == [rows[1] + "\n", rows[3] + "\n"]
+
+
+def test_crlf_and_empty_log(tmp_path):
+    path = tmp_path / "UE_game.log"
+    path.write_bytes(b"")
+    assert list(scan_lines(str(path))) == []
+    line = GAME + "BagMgr@:Modfy BagItem PageId = 102 SlotId = 1 ConfigBaseId = 5011 Num = 3"
+    path.write_bytes((line + "\r\n").encode("utf-8"))
+    assert list(scan_lines(str(path))) == [line + "\n"]
@@ -0,0 +1,85 @@
+import os
+
+from log_tailer import LogTailer
+
+
+def append(path, data):
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def test_starts_at_end_and_returns_new_lines(tmp_path):
+    path = tmp_path / "UE_game.log"
+    path.write_bytes(b"old line\n")
+    tailer = LogTailer(str(path))
+    assert tailer.open()
+    assert tailer.read() == ""
+    append(path, b"one\ntwo\n")
+    assert tailer.read() == "one\ntwo\n"
+    assert tailer.position == os.path.getsize(path)
+
+
+def test_partial_line_waits_for_its_end(tmp_path):
+    path = tmp_path / "UE_game.log"
+    path.write_bytes(b"")
+    tailer = LogTailer(str(path))
+    tailer.open()
+    append(path, b"first\nBagMgr@:Modfy Bag")
+    assert tailer.read() == "first\n"
+    # The held-back text is not consumed yet
+    assert tailer.position == len(b"first\n")
+    assert tailer.bytes_behind() == len(b"BagMgr@:Modfy Bag")
+    append(path, b"Item Num = 3\n")
+    assert tailer.read() == "BagMgr@:Modfy BagItem Num = 3\n"
+
+
+def test_utf8_and_crlf_split_across_reads(tmp_path):
+    path = tmp_path / "UE_game.log"
+    path.write_bytes(b"")
+    tailer = LogTailer(str(path))
+    tailer.open()
+    data = "名字\r\n".encode("utf-8")
+    append(path, data[:2])
+    assert tailer.read() == ""
+    append(path, data[2:])
+    assert tailer.read() == "名字\n"
+
+
+def test_truncation_restarts_from_the_beginning(tmp_path):
+    path = tmp_path / "UE_game.log"
+    path.write_bytes(b"a long line from the previous game session\n")
+    tailer = LogTailer(str(path))
+    tailer.open()
+    with open(path, "wb") as f:
+        f.write(b"new\n")
+    assert tailer.read() == "new\n"
+    assert tailer.reopens == 1
+
+
+def test_replaced_file_is_reopened(tmp_path):
+    path = tmp_path / "UE_game.log"
+    path.write_bytes(b"old\n")
+    tailer = LogTailer(str(path))
+    tailer.open()
+    replacement = tmp_path / "new.log"
+    replacement.write_bytes(b"fresh log with more bytes than before\n")
+    os.replace(replacement, path)
+    if os.stat(path).st_ino == 0:
+        # No inode numbers on this file system; only truncation can be detected
+        return
+    assert tailer.read() == "fresh log with more bytes than before\n"
+    assert tailer.reopens == 1
+    tailer.close()
+
+
+def test_poll_backs_off_while_idle(tmp_path):
+    path = tmp_path / "UE_game.log"
+    path.write_bytes(b"")
+    tailer = LogTailer(str(path), min_interval=0.01, max_interval=0.04)
+    tailer.open()
+    for _ in range(4):
+        tailer.poll(wait=False)
+    assert tailer.interval == 0.04
+    append(path, b"x\n")
+    assert tailer.poll(wait=False) == "x\n"
+    assert tailer.interval == 0.01
@@ -0,0 +1,43 @@
+import io
+
+from reverse_reader import iter_lines_reversed, tail_lines
+
+DATA = b"first\r\nsecond\n\nfourth line\nlast"
+
+
+def expected_lines(data):
+    offset = 0
+    rows = []
+    for line in data.split(b"\n"):
+        rows.append((offset, line.rstrip(b"\r")))
+        offset += len(line) + 1
+    if data.endswith(b"\n"):
+        rows.pop()
+    return rows[::-1]
+
+
+def test_matches_forward_split_for_every_block_size():
+    for data in (DATA, DATA + b"\n", b"\n", b"only"):
+        for block_size in range(1, len(data) + 2):
+            got = list(iter_lines_reversed(io.BytesIO(data), block_size=block_size))
+            assert got == expected_lines(data), (data, block_size)
+
+
+def test_empty_file():
+    assert list(iter_lines_reversed(io.BytesIO(b""))) == []
+
+
+def test_stops_at_end_offset():
+    end = DATA.index(b"fourth")
+    got = [line for _, line in iter_lines_reversed(io.BytesIO(DATA), end=end, block_size=4)]
+    assert got == [b"", b"second", b"first"]
+
+
+def test_tail_lines(tmp_path):
+    path = tmp_path / "UE_game.log"
+    path.write_bytes(b"".join(f"line {i}\n".encode() for i in range(100)))
+    assert tail_lines(str(path), 3, block_size=16) == ["line 97", "line 98", "line 99"]
+    evens = tail_lines(str(path), 2, match=lambda line: line.endswith("0"))
+    assert evens == ["line 80", "line 90"]
+    # Only the last 16 bytes are looked at: "line 98\nline 99\n"
+    assert tail_lines(str(path), 50, max_bytes=16) == ["line 98", "line 99"]
@@ -0,0 +1,455 @@
+"""
+Tracking state for one game session, independent of the Tk UI.
+
+TrackerSession turns parsed log chunks (log_parser.LogChunk) into bag changes,
+drops, income and map counts. index.py drives it from the log thread and
+renders the results; replay.py drives it headless over a saved log.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from bag_tracker import BagState
+from perf_stats import PerfRecorder
+from rolling_rates import IncomeRates, DEFAULT_WINDOWS, DEFAULT_LAST_MAPS
+
+# Base currency: never taxed and never repriced from exchange price checks
+CURRENCY_ID = "100300"
+TAX_RATE = 0.875
+
+# One processed drop (amount > 0) or consumption (amount < 0)
+DropEvent = namedtuple("DropEvent", "item_id name amount price")
+
+
+class MapRun:
+    """One map entered from the refuge; income keeps counting until the next map starts"""
+
+    __slots__ = ("index", "entered", "exited", "income")
+
+    def __init__(self, index, entered):
+        self.index = index
+        self.entered = entered
+        self.exited = None
+        self.income = 0
+
+
+class ChunkResult:
+    """What a single log chunk changed, for the caller to render or record"""
+
+    __slots__ = ("entering_map", "exiting_map", "drops", "initialized")
+
+    def __init__(self):
+        self.entering_map = False
+        self.exiting_map = False
+        self.drops = []          # DropEvent for every item counted this chunk
+        self.initialized = 0     # unique item count when an InitBagData snapshot was applied
+
+
+def average_price(values, limit=30):
+    """Average of the first `limit` price samples, or -1 if there are none"""
+    if len(values) == 0:
+        return -1
+    num_values = min(len(values), limit)
+    return sum(float(values[i]) for i in range(num_values)) / num_values
+
+
+def collect_price_updates(price_records):
+    """Turn PriceRecords into {item_id: rounded average price}, skipping unusable checks"""
+    updates = {}
+    for item_id, values in price_records:
+        if item_id == CURRENCY_ID:
+            continue
+        average_value = average_price(values)
+        # If no usable samples were found, skip updating the price
+        if average_value < 0:
+            print(f'Record found: ID:{item_id}, no price samples')
+            continue
+        updates[item_id] = round(average_value, 4)
+    return updates
+
+
+class EffectivePriceTable:
+    """Per-unit item values after tax, keyed by integer item id.
+
+    Built from the catalog's prices in one pass and rebuilt only when the tax
+    setting changes or the catalog's table is replaced (a reload or a price
+    update), so valuing drops is a plain dict lookup per item.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.values = {}
+        self.builds = 0
+        self._key = None
+
+    def current(self, tax):
+        """The value table for this tax setting, rebuilt if the catalog changed"""
+        key = (self.catalog.version, bool(tax))
+        if key != self._key:
+            self.rebuild(tax)
+        return self.values
+
+    def rebuild(self, tax):
+        catalog = self.catalog
+        version = catalog.version
+        values = {}
+        for item_id, price in catalog.prices.items():
+            if not item_id.isdigit():
+                continue
+            if tax and item_id != CURRENCY_ID:
+                price = price * TAX_RATE
+            values[int(item_id)] = price
+        self.values = values
+        self._key = (version, bool(tax))
+        self.builds += 1
+
+
+class TrackerSession:
+    """Bag state, drops, income and map timing for one game log"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.tax = False
+        self.effective_prices = EffectivePriceTable(catalog)
+        # Stage timings; disabled (and nearly free) unless the app shares an enabled recorder
+        self.perf = PerfRecorder()
+        self.exclude_list = []
+        self.pending_items = {}
+        self.is_in_map = False
+        self.map_start = time.time()
+        self.rate_windows = DEFAULT_WINDOWS
+        self.rate_last_maps = DEFAULT_LAST_MAPS
+        # Held while a chunk is applied; other threads copy the bag and drop lists under it
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Clear bag state and all statistics (the Reset Tracking button)"""
+        with self.lock:
+            self.bag_state = BagState()
+            self.bag_initialized = False
+            self.first_scan = True
+            self.initialization_complete = False
+            self.awaiting_initialization = False
+            self.initialization_in_progress = False
+            self.drop_list = {}
+            self.drop_list_all = {}
+            self.income = 0
+            self.income_all = 0
+            self.started = time.time()
+            self.total_time = 0
+            self.map_count = 0
+            self.map_runs = []
+            self.rates = IncomeRates(self.rate_windows, self.rate_last_maps)
+
+    def configure_rates(self, windows, last_maps):
+        """Set the rolling-rate windows (seconds) and map count; clears the rolling rates"""
+        self.rate_windows = tuple(windows)
+        self.rate_last_maps = last_maps
+        self.rates = IncomeRates(self.rate_windows, self.rate_last_maps)
+
+    # --- initialization -------------------------------------------------
+
+    def start_initialization(self):
+        """Wait for the next InitBagData burst (bag sort). Returns False if already waiting."""
+        if self.initialization_in_progress:
+            return False
+        self.awaiting_initialization = True
+        self.initialization_in_progress = True
+        return True
+
+    def initialize_bag_state(self, chunk):
+        """Initialize the bag state by scanning all current items (legacy method)"""
+        if not self.first_scan:
+            return False  # Only try to initialize on the first scan
+
+        self.first_scan = False
+
+        # Try to find initialization marker
+        if chunk.login_seen:
+            print("Detected player login or initialization - resetting bag state")
+            self.bag_state.clear()
+            return True
+
+        matches = chunk.bag_modify
+
+        if len(matches) > 10:  # Assume we found a big batch of items - good for initialization
+            print(f"Found {len(matches)} bag items - initializing bag state")
+            self.bag_state.apply(matches)
+            self.bag_initialized = True
+            # Treat this as a complete initialization so downstream code doesn't
+            # misinterpret the first observed snapshot as drops.
+            self.bag_state.reset_baseline()
+            return True
+
+        return False
+
+    def process_initialization(self, chunk):
+        """Apply a BagMgr@:InitBagData snapshot; returns the unique item count, or 0 if none applied"""
+        if not self.awaiting_initialization:
+            return 0
+
+        # BagMgr@:InitBagData entries (complete inventory data)
+        matches = chunk.bag_init
+
+        # Only proceed if we found a significant number of entries
+        if len(matches) < 20:
+            return 0
+
+        print(f"Found {len(matches)} BagMgr@:InitBagData entries - initializing bag state")
+
+        # Replace the bag state with the complete snapshot; its totals become the baseline
+        self.bag_state.load_snapshot(matches)
+        item_count = len(self.bag_state.totals)
+
+        print(f"Successfully initialized {item_count} unique item types across {len(matches)} inventory slots")
+        self.bag_initialized = True
+        self.initialization_complete = True
+        self.awaiting_initialization = False
+        self.initialization_in_progress = False
+        return item_count
+
+    def restore_bag(self, bag_state):
+        """Adopt a bag rebuilt from the log (bag_recovery) as the initialized bag and baseline"""
+        bag_state.reset_baseline()
+        with self.lock:
+            self.bag_state = bag_state
+            self.bag_initialized = True
+            self.initialization_complete = True
+            self.first_scan = False
+            self.awaiting_initialization = False
+            self.initialization_in_progress = False
+        return len(bag_state.totals)
+
+    def bag_totals(self):
+        """Copy of the per-item bag totals, safe to take while another thread applies chunks"""
+        with self.lock:
+            return dict(self.bag_state.totals)
+
+    def copy_drops(self, all_maps=False):
+        """Copy of the all-time or current-map drop list, safe to take from another thread"""
+        with self.lock:
+            return dict(self.drop_list_all if all_maps else self.drop_list)
+
+    # --- bag changes ------------------------------------------------------
+
+    def detect_bag_changes(self, chunk):
+        """Detect changes to the bag and calculate both gains and losses"""
+        # If bag isn't initialized yet, we can't detect changes properly
+        if not self.bag_initialized:
+            return []
+
+        matches = chunk.bag_modify
+        if not matches:
+            return []
+
+        changes = []
+
+        # Apply all slot updates; the bag keeps per-item totals up to date as it goes
+        slot_changes = self.bag_state.apply(matches)
+
+        # Now compare with baseline values to see net changes
+        baseline = self.bag_state.baseline
+        for item_id, slot_change in slot_changes.items():
+            if slot_change == 0:
+                continue
+
+            current_total = self.bag_state.total(item_id)
+
+            # Calculate net change from initial state
+            net_change = current_total - baseline.get(item_id, 0)
+
+            if net_change != 0:
+                changes.append((item_id, net_change))
+
+                # Update the baseline to current total for this item
+                # This ensures subsequent changes are measured from the new baseline
+                baseline[item_id] = current_total
+
+        return changes
+
+    def scan_for_bag_changes(self, chunk, result=None):
+        """Enhanced bag change scanner that handles initialization"""
+        # Check if we're in initialization mode and process accordingly
+        if self.awaiting_initialization:
+            item_count = self.process_initialization(chunk)
+            if item_count:
+                if result is not None:
+                    result.initialized = item_count
+                return []  # Skip drop detection during initialization
+
+        # If bag is properly initialized, use the new tracking method
+        if self.bag_initialized and self.initialization_complete:
+            return self.detect_bag_changes(chunk)
+
+        # If bag isn't initialized yet, use the old method
+        if not self.bag_initialized:
+            # Use the original initialization method as fallback
+            if self.initialize_bag_state(chunk):
+                return []
+
+        # Legacy method for tracking changes if not properly initialized
+        matches = chunk.bag_modify
+        if not matches:
+            return []
+
+        # Remember whether the bag was empty before this update
+        was_empty = self.bag_state.total_count == 0
+
+        # Apply the updates; per-item totals are maintained incrementally
+        item_changes = self.bag_state.apply(matches)
+
+        # If we had no previous totals (likely first scan), treat this snapshot as baseline
+        if was_empty and self.bag_state.total_count > 0:
+            # Avoid large false-positive drops on first observed update
+            return []
+
+        # Compare total counts to detect drops, even across stacks
+        return [(item_id, change) for item_id, change in item_changes.items() if change > 0]
+
+    def reset_map_baseline(self):
+        """Reset the baseline for map tracking to current inventory state"""
+        # The bag already keeps current totals per item; the baseline is just a copy of them
+        self.bag_state.reset_baseline()
+        print(f"Reset map baseline for {len(self.bag_state.baseline)} items")
+
+    # --- drops and income -------------------------------------------------
+
+    def item_price(self, item_id):
+        """Per-unit value of an item, after tax if enabled"""
+        return self.effective_prices.current(self.tax).get(int(item_id), 0)
+
+    def process_drops(self, drops):
+        """Process detected drops and consumption, update statistics; returns the DropEvents"""
+        # First, consolidate multiple changes to the same item in this batch
+        consolidated_changes = {}
+        for item_id, amount in drops:
+            item_id = str(item_id)
+            consolidated_changes[item_id] = consolidated_changes.get(item_id, 0) + amount
+
+        names = self.catalog.names
+        values = self.effective_prices.current(self.tax)
+        events = []
+        # Now process the consolidated changes
+        for item_id, amount in consolidated_changes.items():
+            # Check if we have a name for this item
+            if item_id not in names:
+                # No item name found, add to pending queue
+                if item_id not in self.pending_items:
+                    print(f"[NETWORK] ID {item_id} doesn't exist locally, fetching")
+                    self.pending_items[item_id] = amount
+                else:
+                    self.pending_items[item_id] += amount
+                    print(f"[NETWORK] ID {item_id} already in queue, accumulated: {self.pending_items[item_id]}")
+                continue
+            item_name = names[item_id]
+
+            # Check exclusion list
+            if self.exclude_list and item_name in self.exclude_list:
+                print(f"Excluded: {item_name} x{amount}")
+                continue
+
+            # Update counters (positive for gains, negative for consumption)
+            self.drop_list[item_id] = self.drop_list.get(item_id, 0) + amount
+            self.drop_list_all[item_id] = self.drop_list_all.get(item_id, 0) + amount
+
+            # Calculate price impact; amount can be positive (gain) or negative (consumption)
+            price = values.get(int(item_id))
+            if price is None:
+                price = 0.0
+            else:
+                self.income += price * amount
+                self.income_all += price * amount
+                if self.map_runs:
+                    self.map_runs[-1].income += price * amount
+
+            events.append(DropEvent(item_id, item_name, amount, price))
+        return events
+
+    # --- maps and timing --------------------------------------------------
+
+    def enter_map(self, now):
+        if self.map_runs and self.map_runs[-1].exited is not None:
+            # The previous map's income is final now; it joins the last-N-maps rate
+            run = self.map_runs[-1]
+            self.rates.add_map(run.income, run.exited - run.entered)
+        self.is_in_map = True
+        self.drop_list = {}
+        self.income = 0  # Start fresh for this map, costs will be tracked automatically
+        self.map_count += 1
+        self.map_runs.append(MapRun(self.map_count, now))
+
+        # Reset baseline when entering a map - snapshot current state as starting point
+        # This needs to happen BEFORE processing any bag changes from this log batch
+        self.reset_map_baseline()
+
+    def exit_map(self, now):
+        self.is_in_map = False
+        self.total_time += now - self.map_start
+        if self.map_runs:
+            self.map_runs[-1].exited = now
+
+    def start_clock(self, now):
+        """Start the session, map and rolling-rate clocks at `now` (replays run on the log's clock)"""
+        self.started = now
+        self.map_start = now
+        self.rates.started = now
+
+    def tick(self, now=None):
+        """Restart the map clock while in the refuge, so map time starts at entry"""
+        if not self.is_in_map:
+            self.map_start = time.time() if now is None else now
+
+    def current_map_time(self, now=None):
+        return (time.time() if now is None else now) - self.map_start
+
+    def total_play_time(self, now=None):
+        """Time spent inside maps this session"""
+        return self.total_time + self.current_map_time(now)
+
+    def session_time(self, now=None):
+        """Wall-clock time since the session started or was reset, refuge time included"""
+        return (time.time() if now is None else now) - self.started
+
+    def process_chunk(self, chunk, now=None):
+        """Apply one parsed log chunk and return a ChunkResult describing what changed"""
+        with self.lock:
+            return self._process_chunk(chunk, now)
+
+    def _process_chunk(self, chunk, now):
+        if now is None:
+            now = time.time()
+        result = ChunkResult()
+
+        # Check if entering/leaving maps based on scene changes
+        result.entering_map = chunk.entering_map
+        result.exiting_map = chunk.exiting_map
+        if chunk.entering_map:
+            self.enter_map(now)
+        if chunk.exiting_map:
+            self.exit_map(now)
+
+        # Item names and prices come from the shared catalog; this only re-parses
+        # full_table.json when the file has changed on disk
+        try:
+            self.catalog.refresh()
+        except Exception as e:
+            print(f"Error loading item data: {e}")
+            return result
+
+        # Scan for bag changes (drops) - this will use the baseline set above if we just entered a map
+        perf = self.perf
+        t = perf.clock()
+        drops = self.scan_for_bag_changes(chunk, result)
+        perf.record("bag scan", t, len(chunk.bag_modify) + len(chunk.bag_init))
+        if drops:
+            t = perf.clock()
+            income_before = self.income_all
+            result.drops = self.process_drops(drops)
+            if self.income_all != income_before:
+                self.rates.add_income(self.income_all - income_before, now)
+            perf.record("drops", t, len(drops))
+            if not self.is_in_map:
+                self.is_in_map = True
+        return result
@@ -0,0 +1,89 @@
+"""
+Main-thread update pump for the Tk UI.
+
+Tk widgets may only be touched from the thread running mainloop(). Background
+threads (the log thread, price updates) hand their UI work to a UiUpdatePump
+instead of calling widgets directly; a Tk after() timer drains it once per
+frame on the main thread.
+
+- request(key, fn): coalesced; however many times a key is requested within
+  a frame, only the latest fn runs once (e.g. one reshow per frame during a
+  loot burst)
+- post(fn): runs every call, in order (one-off status changes)
+"""
+
+import threading
+import traceback
+from collections import deque
+
+FRAME_MS = 50
+
+
+class UiUpdatePump:
+    """Thread-safe queue of UI callbacks drained by root.after() at a fixed frame rate"""
+
+    def __init__(self, root, frame_ms=FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.requested = 0
+        self.coalesced = 0
+        self.executed = 0
+        self.frames = 0
+        self._pending = {}       # key -> latest callback, in first-request order
+        self._posted = deque()
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.root.after(self.frame_ms, self._drain)
+        return self
+
+    def stop(self):
+        self._running = False
+
+    def request(self, key, fn):
+        """Run fn on the next frame; replaces a pending callback with the same key"""
+        with self._lock:
+            self.requested += 1
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = fn
+
+    def post(self, fn):
+        """Run fn on the next frame, after earlier posts"""
+        with self._lock:
+            self.requested += 1
+            self._posted.append(fn)
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "executed": self.executed,
+        }
+
+    def _drain(self):
+        if not self._running:
+            return
+        with self._lock:
+            posted = self._posted
+            self._posted = deque()
+            pending = self._pending
+            self._pending = {}
+        if posted or pending:
+            self.frames += 1
+        # One-off posts first so a status change is visible in the same frame as the refresh
+        for fn in list(posted) + list(pending.values()):
+            try:
+                fn()
+            except Exception:
+                traceback.print_exc()
+            self.executed += 1
+        try:
+            self.root.after(self.frame_ms, self._drain)
+        except Exception:
+            # The window is gone
+            self._running = False
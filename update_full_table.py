@@ -5,6 +5,7 @@ Force-apply local overrides into full_table.json so the app can be updated while
 - overlays: en_id_table.json, translation_mapping.json
 - writes a backup full_table.json.bak before replacing
 - produces a minimal full_table.json containing only {name,type,price}
+- compiles it to full_table.bin, which the app loads instead of parsing the JSON
 
 Note: price.json is ignored in the standalone build. Edit `full_table.json` directly
 to change prices.
@@ -15,6 +16,8 @@ import json
 import os
 import shutil
 
+from compiled_catalog import compile_catalog, compiled_path, source_stamp
+
 ROOT = os.path.dirname(__file__)
 FULL = os.path.join(ROOT, "full_table.json")
 EN = os.path.join(ROOT, "en_id_table.json")
@@ -85,5 +88,10 @@ except Exception:
 with open(FULL, "w", encoding="utf-8") as f:
     json.dump(minimal, f, ensure_ascii=False, indent=2)
 
+# Compiled copy for fast app startup; the app falls back to the JSON if it is stale
+compiled_ok = compile_catalog(minimal, compiled_path(FULL), source_stamp(FULL))
+
 print(f"Updated {FULL} with {len(minimal)} entries (backup at {FULL}.bak if present)")
+if compiled_ok:
+    print(f"Compiled catalog written to {compiled_path(FULL)}")
 print("You can run this while the app is running to force the UI to pick up translations/prices.")